@@ -30,20 +30,17 @@
 
 from __future__ import unicode_literals, absolute_import
 from setuptools import setup, find_packages
-import sys
 
 __author__ = 'Constantin Roganov'
 __version__ = '2.0.0'
 
-install_requires = ['future >= 0.16.0'] if sys.version_info[0] == 2 else []
-
 
 setup(
     name='utl',
     version=__version__,
     packages=find_packages(),
     zip_safe=True,
-    install_requires=install_requires,
+    python_requires='>=3.5',
     author=__author__,
     author_email='rccbox at gmail dot com',
     description='My Python utilities for every day',
@@ -53,7 +50,8 @@ setup(
     classifiers=[
         'Development Status :: 3 - Alpha',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 2.7',
+        'Programming Language :: Python :: 3',
         'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3.6',
     ],
 )
@@ -0,0 +1,149 @@
+#!/usr/bin/env python 
+# -*- coding: UTF-8 -*-
+# ------------------------------------------------------------------------------
+# Name:    test_async.py      
+# Package: test
+# Project: python-utl
+# 
+# Created: 17.10.2026 12:10   
+# License: The MIT License
+# ------------------------------------------------------------------------------
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE. 
+# ------------------------------------------------------------------------------
+
+"""Tests for utl.async_"""
+
+import asyncio
+import unittest
+from os import remove
+
+from utl.async_ import *
+from utl.text import ParseStats
+
+
+class TestFollow(unittest.TestCase):
+
+    test_file_name = 'AsyncFollowTest.txt'
+
+    def setUp(self):
+        with open(self.test_file_name, 'wb') as fd:
+            fd.write(b'1111\n2222\n')
+
+    def tearDown(self):
+        remove(self.test_file_name)
+
+    def test_ok(self):
+        async def read_lines():
+            lines = follow(self.test_file_name, 0, min_interval=0.001)
+            result = [await lines.__anext__(), await lines.__anext__()]
+
+            with open(self.test_file_name, 'ab') as fd:
+                fd.write(b'3333\n')
+
+            result.append(await lines.__anext__())
+            await lines.aclose()
+
+            return result
+
+        result = asyncio.run(read_lines())
+
+        self.assertListEqual([u'1111', u'2222', u'3333'], result)
+
+    def test_closed(self):
+        async def read_lines():
+            lines = follow(self.test_file_name, 0)
+            await lines.aclose()
+
+            return [line async for line in lines]
+
+        self.assertListEqual([], asyncio.run(read_lines()))
+
+
+async def _collect(aiterable):
+    return [item async for item in aiterable]
+
+
+def _parse_line(line):
+    return line if line else None
+
+
+async def _parse_line_async(line):
+    await asyncio.sleep(0)
+    return _parse_line(line)
+
+
+class TestLinesProcessing(unittest.TestCase):
+
+    test_file_names = ['AsyncLinesTest{}.txt'.format(i) for i in range(2)]
+    test_content = '1111\n\n2222\n333'
+
+    def setUp(self):
+        for name in self.test_file_names:
+            with open(name, 'w') as fd:
+                fd.write(self.test_content)
+
+    def tearDown(self):
+        for name in self.test_file_names:
+            remove(name)
+
+    def test_reverse_lines(self):
+        with open(self.test_file_names[0], 'rb') as fd:
+            result = asyncio.run(_collect(reverse_lines(fd, batch_size=2)))
+
+        self.assertListEqual(['333', '2222', '', '1111'], result)
+
+    def test_offset_iter(self):
+        with open(self.test_file_names[0], 'rb') as fd:
+            result = asyncio.run(_collect(offset_iter(fd)))
+
+        self.assertListEqual([(0, b'1111\n'), (5, b'\n'), (6, b'2222\n'), (11, b'333')], result)
+
+    def test_lines_parser(self):
+        async def lines():
+            for line in self.test_content.split('\n'):
+                yield line
+
+        expected = [
+            (ParseStats(1, 1), '1111'),
+            (ParseStats(3, 2), '2222'),
+            (ParseStats(4, 3), '333'),
+        ]
+
+        self.assertListEqual(expected, asyncio.run(_collect(lines_parser(lines(), _parse_line))))
+        self.assertListEqual(expected, asyncio.run(_collect(lines_parser(lines(), _parse_line_async))))
+
+    def test_filelist_processor(self):
+        progress = []
+
+        def progress_co():
+            while True:
+                progress.append((yield))
+
+        co = progress_co()
+        next(co)
+
+        result = asyncio.run(_collect(filelist_processor(self.test_file_names, _parse_line_async, co, batch_size=2)))
+
+        self.assertListEqual(['1111', '2222', '333'] * 2, result)
+        self.assertEqual(('AsyncLinesTest1.txt', 4, 4, 6), progress[-1])
+
+    def test_filelist_processor_binary(self):
+        result = asyncio.run(_collect(filelist_processor(self.test_file_names[:1], _parse_line, binary=True)))
+
+        self.assertListEqual([b'1111', b'2222', b'333'], result)
@@ -30,11 +30,13 @@
 
 """Unittests for utl.files"""
 
+import threading
 import unittest
 from os import remove
+from os.path import getsize
 
 from utl.files import *
-from utl.files import _reverse_blocks_generator
+from utl.files import _FileFollower, _reverse_blocks_generator
 
 
 class TestLinesCount(unittest.TestCase):
@@ -72,6 +74,134 @@ class TestLinesCount(unittest.TestCase):
 
         self.assertEqual(lines_expected, result)
 
+    def test_backends(self):
+        for lines_expected in (0, 1, 101):
+            self.create_test_file(lines_expected)
+            for backend in ('text', 'buffer', 'mmap'):
+                result = file_lines_count(self.test_file_name, backend)
+
+                self.assertEqual(lines_expected, result, backend)
+
+    def test_unknown_backend(self):
+        self.create_test_file(1)
+
+        with self.assertRaises(ValueError):
+            file_lines_count(self.test_file_name, 'unknown')
+
+
+class TestLinesCountParallel(unittest.TestCase):
+
+    test_file_names = ['LinesCountParallelTest{}.txt'.format(i) for i in range(3)]
+    lines_expected = [0, 1, 1001]
+
+    def setUp(self):
+        for name, num in zip(self.test_file_names, self.lines_expected):
+            with writable_text_file(name) as fd:
+                fd.write('\n'.join('LinesCountTest {:04d}'.format(i) for i in range(num)))
+
+    def tearDown(self):
+        for name in self.test_file_names:
+            remove(name)
+
+    def test_threads(self):
+        for name, lines_expected in zip(self.test_file_names, self.lines_expected):
+            result = file_lines_count_parallel(name, block_size=100)
+
+            self.assertEqual(lines_expected, result)
+
+    def test_processes(self):
+        name = self.test_file_names[-1]
+        result = file_lines_count_parallel(name, workers=2, processes=True, block_size=1000)
+
+        self.assertEqual(self.lines_expected[-1], result)
+
+    def test_files_lines_count(self):
+        result = files_lines_count(self.test_file_names)
+
+        self.assertDictEqual(dict(zip(self.test_file_names, self.lines_expected)), result)
+
+
+class TestLinesCountCache(unittest.TestCase):
+
+    test_file_names = ['LinesCountCacheTest{}.txt'.format(i) for i in range(2)]
+    cache_file_name = 'LinesCountCache.json'
+
+    @staticmethod
+    def write(name, text, mode='w'):
+        with open(name, mode) as fd:
+            fd.write(text)
+
+    def setUp(self):
+        for name in self.test_file_names:
+            self.write(name, '1111\n2222\n3333')
+
+    def tearDown(self):
+        for name in self.test_file_names + [self.cache_file_name]:
+            if os.path.exists(name):
+                remove(name)
+
+    def test_unchanged(self):
+        cache = LinesCountCache()
+
+        self.assertEqual(3, cache(self.test_file_names[0]))
+        self.assertEqual(3, cache(self.test_file_names[0]))
+        self.assertEqual(1, len(cache))
+
+    def test_appended(self):
+        cache = LinesCountCache()
+        cache(self.test_file_names[0])
+        self.write(self.test_file_names[0], '\n4444\n5555', 'a')
+
+        self.assertEqual(5, cache(self.test_file_names[0]))
+
+    def test_rewritten(self):
+        cache = LinesCountCache()
+        cache(self.test_file_names[0])
+        self.write(self.test_file_names[0], '1111\n\n\n\n2222\n3333')
+
+        self.assertEqual(6, cache(self.test_file_names[0]))
+
+    def test_lru_eviction(self):
+        cache = LinesCountCache(max_entries=1)
+        for name in self.test_file_names:
+            cache(name)
+
+        self.assertEqual(1, len(cache))
+
+    def test_persistence(self):
+        with LinesCountCache(self.cache_file_name) as cache:
+            cache(self.test_file_names[0])
+
+        cache = LinesCountCache(self.cache_file_name)
+
+        self.assertEqual(1, len(cache))
+        self.assertEqual(3, cache(self.test_file_names[0]))
+
+    def test_threads(self):
+        cache = LinesCountCache(self.cache_file_name, max_entries=1)
+        errors = []
+
+        def count():
+            try:
+                for _ in range(200):
+                    for name in self.test_file_names:
+                        cache(name)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for t in threads:
+            t.start()
+
+        for _ in range(50):
+            cache.save()
+
+        for t in threads:
+            t.join()
+
+        self.assertListEqual([], errors)
+        self.assertEqual(1, len(cache))
+
 
 class TestReverseBlocksGenerator(unittest.TestCase):
 
@@ -140,6 +270,167 @@ class TestReverseLines(unittest.TestCase):
             with text_file(self.test_file_name) as fd:
                 list(reverse_lines(fd))
 
+    def reverse_lines(self, content, *args, **kwargs):
+        with writable_binary_file(self.test_file_name) as fd:
+            fd.write(content)
+
+        with binary_file(self.test_file_name) as fd:
+            return list(reverse_lines(fd, *args, **kwargs))
+
+    def test_trailing_newline(self):
+        result = self.reverse_lines(b'1111\n2222\n\n', block_size=3)
+        self.assertListEqual([u'', u'2222', u'1111'], result)
+
+    def test_empty(self):
+        self.assertListEqual([u''], self.reverse_lines(b''))
+
+    def test_long_line(self):
+        result = self.reverse_lines(b'1' * 1000 + b'\n2222', block_size=7)
+        self.assertListEqual([u'2222', u'1' * 1000], result)
+
+    def test_windows_newlines(self):
+        content = b'1111\r\n2222\r\n3333'
+        self.assertListEqual([u'3333', u'2222', u'1111'], self.reverse_lines(content, block_size=3))
+        self.assertListEqual([u'3333', u'2222\r\n', u'1111\r\n'], self.reverse_lines(content, True, 3))
+
+    def test_utf8(self):
+        content = u'\u0444\u0430\u0439\u043b\n\u0441\u0442\u0440\u043e\u043a\u0430'.encode('utf-8')
+        result = self.reverse_lines(content, block_size=3, encoding='utf-8')
+        self.assertListEqual([u'\u0441\u0442\u0440\u043e\u043a\u0430', u'\u0444\u0430\u0439\u043b'], result)
+
+    def test_separator(self):
+        result = self.reverse_lines(b'1111\x002222\x003333', block_size=3, separator=b'\x00')
+        self.assertListEqual([u'3333', u'2222', u'1111'], result)
+
+    def test_invalid_separator(self):
+        with self.assertRaises(ValueError):
+            self.reverse_lines(b'1111\r\n2222', separator=b'\r\n')
+
+
+class TestReverseLinesMmap(unittest.TestCase):
+
+    test_file_name = 'ReverseLinesMmapTest.txt'
+    contents = (
+        b'',
+        b'\n',
+        b'1111',
+        b'1111\n2222\n3333\n444',
+        b'1111\n2222\n\n',
+        b'1111\r\n2222\r\n3333\r\n',
+    )
+
+    def write(self, content):
+        with writable_binary_file(self.test_file_name) as fd:
+            fd.write(content)
+
+    def tearDown(self):
+        remove(self.test_file_name)
+
+    def test_same_as_reverse_lines(self):
+        for content in self.contents:
+            self.write(content)
+            for keepends in (False, True):
+                with binary_file(self.test_file_name) as fd:
+                    expected = list(reverse_lines(fd, keepends, 3))
+                    result = list(reverse_lines_mmap(fd, keepends))
+
+                self.assertListEqual(expected, result, (content, keepends))
+
+    def test_tail(self):
+        self.write(b'1111\n2222\n3333\n444\n')
+
+        self.assertListEqual([u'3333', u'444'], tail(self.test_file_name, 2))
+        self.assertListEqual([u'1111', u'2222', u'3333', u'444'], tail(self.test_file_name, 10))
+
+    def test_tail_empty(self):
+        self.write(b'')
+
+        self.assertListEqual([], tail(self.test_file_name, 2))
+
+
+class TestFollow(unittest.TestCase):
+
+    test_file_name = 'FollowTest.txt'
+
+    def write(self, content, mode='ab'):
+        with open(self.test_file_name, mode) as fd:
+            fd.write(content)
+
+    def setUp(self):
+        self.write(b'1111\n', 'wb')
+        self.lines = follow(self.test_file_name, min_interval=0.001, max_interval=0.01)
+
+    def tearDown(self):
+        self.lines.close()
+        remove(self.test_file_name)
+
+    def test_appended(self):
+        self.write(b'2222\n33')
+        self.assertEqual(u'2222', next(self.lines))
+
+        self.write(b'33\r\n')
+        self.assertEqual(u'3333', next(self.lines))
+
+    def test_from_offset(self):
+        self.lines.close()
+        self.lines = follow(self.test_file_name, 0)
+        self.assertEqual(u'1111', next(self.lines))
+
+    def test_truncated(self):
+        self.write(b'2222\n')
+        self.assertEqual(u'2222', next(self.lines))
+
+        self.write(b'3\n', 'wb')
+        self.assertEqual(u'3', next(self.lines))
+
+    def test_rotated(self):
+        self.write(b'2222\n')
+        self.assertEqual(u'2222', next(self.lines))
+
+        self.write(b'3333')
+        rotated_name = self.test_file_name + '.1'
+        os.rename(self.test_file_name, rotated_name)
+        self.write(b'4444\n', 'wb')
+
+        try:
+            self.assertListEqual([u'3333', u'4444'], [next(self.lines), next(self.lines)])
+        finally:
+            remove(rotated_name)
+
+    def test_closed(self):
+        self.lines.close()
+        self.assertListEqual([], list(self.lines))
+
+    def test_block_size(self):
+        self.write(b''.join(b'%04d\n' % i for i in range(100)) + b'long line' * 10 + b'\n')
+        follower = _FileFollower(self.test_file_name, 0, block_size=16)
+
+        try:
+            self.assertListEqual([u'1111', u'0000', u'0001'], follower.read_lines())
+            self.assertListEqual([u'0002', u'0003', u'0004'], follower.read_lines())
+
+            lines = [line for _ in range(40) for line in follower.read_lines()]
+            self.assertEqual(u'0099', lines[-2])
+            self.assertEqual(u'long line' * 10, lines[-1])
+
+        finally:
+            follower.close()
+
+    def test_rotated_block_size(self):
+        self.lines.close()
+        self.lines = follow(self.test_file_name, 0, min_interval=0.001, block_size=4)
+
+        self.write(b'2222\n3333')
+        rotated_name = self.test_file_name + '.1'
+        os.rename(self.test_file_name, rotated_name)
+        self.write(b'4444\n', 'wb')
+
+        try:
+            self.assertListEqual([u'1111', u'2222', u'3333', u'4444'], [next(self.lines) for _ in range(4)])
+        finally:
+            remove(rotated_name)
+
+
 def _fill_files(name_template):
     return [name_template.format(i) for i in range(2)]
 
@@ -176,6 +467,193 @@ class TestFileListProcessor(unittest.TestCase):
 
         self.assertListEqual(self.expected_result, result)
 
+    def test_binary(self):
+        self.create_files()
+
+        result = list(filelist_processor(self.files, lambda x: x, binary=True))
+
+        self.assertListEqual([line.encode('ascii') for line in self.expected_result], result)
+
+    def progress(self, lines_count, background=False):
+        progress = []
+
+        def progress_co():
+            while True:
+                progress.append((yield))
+
+        co = progress_co()
+        next(co)
+        result = list(filelist_processor(self.files, lambda x: x, co, lines_count, background))
+
+        self.assertListEqual(self.expected_result, result)
+
+        return progress
+
+    def test_progress(self):
+        self.create_files()
+        progress = self.progress(file_lines_count)
+
+        self.assertEqual(('filelist_proc_test1.txt', 2, 3, 4), progress[-1])
+
+    def test_unknown_total(self):
+        self.create_files()
+        progress = self.progress(None)
+
+        self.assertEqual(('filelist_proc_test1.txt', 2, None, 4), progress[-1])
+
+    def test_estimated_total(self):
+        self.create_files()
+        progress = self.progress(file_lines_estimate)
+
+        self.assertEqual(('filelist_proc_test1.txt', 2, 3, 4), progress[-1])
+
+    def test_background_total(self):
+        self.create_files()
+        progress = self.progress(file_lines_count, True)
+
+        self.assertTrue(all(lines_total in (None, 3) for _, _, lines_total, _ in progress))
+
+    def test_background_abandoned(self):
+        self.create_files()
+        release = threading.Event()
+
+        def lines_count(pth):
+            release.wait(10)
+            return 3
+
+        def progress_co():
+            while True:
+                yield
+
+        co = progress_co()
+        next(co)
+
+        try:
+            gen = filelist_processor(self.files, lambda x: x, co, lines_count, True)
+            next(gen)
+            gen.close()
+
+            counting = [t for t in threading.enumerate() if t.name == 'lines_count']
+            self.assertTrue(counting)
+            self.assertTrue(all(t.daemon for t in counting))
+
+        finally:
+            release.set()
+
+
+def _parse_line(line):
+    return line if line else None
+
+
+class TestFileListProcessorParallel(unittest.TestCase):
+
+    files = _fill_files('filelist_proc_parallel_test{}.txt')
+    expected_result = [
+        'filelist_proc_parallel_test0.txt 0',
+        'filelist_proc_parallel_test0.txt 1',
+        'filelist_proc_parallel_test1.txt 0',
+        'filelist_proc_parallel_test1.txt 1',
+    ]
+
+    def setUp(self):
+        for n in self.files:
+            TestFileListProcessor.create_file(n)
+
+    def tearDown(self):
+        for name in self.files:
+            remove(name)
+
+    def test_ordered(self):
+        result = list(filelist_processor_parallel(self.files, _parse_line, workers=2, block_size=7))
+
+        self.assertListEqual(self.expected_result, result)
+
+    def test_binary(self):
+        result = list(filelist_processor_parallel(self.files, _parse_line, workers=2, binary=True))
+
+        self.assertListEqual([line.encode('ascii') for line in self.expected_result], result)
+
+    def test_unordered(self):
+        result = list(filelist_processor_parallel(self.files, _parse_line, ordered=False, workers=2))
+
+        self.assertListEqual(self.expected_result, sorted(result))
+
+    def test_progress(self):
+        progress = []
+
+        def progress_co():
+            while True:
+                progress.append((yield))
+
+        co = progress_co()
+        next(co)
+        list(filelist_processor_parallel(self.files, _parse_line, co, workers=2))
+
+        name, read, lines_total, processed, bytes_read = progress[-1]
+
+        self.assertEqual(('filelist_proc_parallel_test1.txt', 2, 4, getsize(self.files[1])),
+                         (name, read, processed, bytes_read))
+        self.assertIn(lines_total, (None, 3))
+
+    def test_progress_slow_count(self):
+        progress = []
+        release = threading.Event()
+
+        def lines_count(pth):
+            release.wait(10)
+            return 3
+
+        def progress_co():
+            while True:
+                progress.append((yield))
+
+        co = progress_co()
+        next(co)
+
+        try:
+            result = list(filelist_processor_parallel(self.files, _parse_line, co, lines_count, workers=2))
+        finally:
+            release.set()
+
+        self.assertListEqual(self.expected_result, result)
+        self.assertTrue(all(lines_total is None for _, _, lines_total, _, _ in progress))
+
+
+class TestLinesEstimate(unittest.TestCase):
+
+    test_file_name = 'LinesEstimateTest.txt'
+
+    def setUp(self):
+        with writable_text_file(self.test_file_name) as fd:
+            fd.write('\n'.join('LinesEstimateTest {:04d}'.format(i) for i in range(1000)))
+
+    def tearDown(self):
+        remove(self.test_file_name)
+
+    def test_exact(self):
+        self.assertEqual(1000, file_lines_estimate(self.test_file_name))
+
+    def test_estimated(self):
+        result = file_lines_estimate(self.test_file_name, 4, 1000)
+
+        self.assertAlmostEqual(1000, result, delta=10)
+
+    def test_estimate_lines(self):
+        result = estimate_lines(self.test_file_name, 4, 1000)
+
+        self.assertAlmostEqual(23, result.line_length, delta=0.5)
+        self.assertLessEqual(result.low, 1000)
+        self.assertGreaterEqual(result.high, 1000)
+
+    def test_estimate_lines_exact(self):
+        self.assertEqual(LinesEstimate(1000, 22.999, 1000, 1000), estimate_lines(self.test_file_name))
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, estimate_lines, self.test_file_name, 0, 64)
+        self.assertRaises(ValueError, estimate_lines, self.test_file_name, 4, 0)
+        self.assertRaises(ValueError, estimate_lines, self.test_file_name, 1, 64)
+        self.assertEqual(1000, estimate_lines(self.test_file_name, 1).lines)
+
 
 class TestOffsetIter(unittest.TestCase):
 
@@ -198,3 +676,123 @@ class TestOffsetIter(unittest.TestCase):
         with binary_file(self.test_file_name) as fd:
             fd.seek(offset, os.SEEK_SET)
             self.assertEqual(result, fd.readline())
+
+
+class TestLinesOffsets(unittest.TestCase):
+
+    test_file_name = 'LinesOffsetsTest.txt'
+    contents = (b'', b'\n', b'1111', b'1111\n2222\n3333\n444', b'1111\n2222\n\n')
+
+    def write(self, content):
+        with writable_binary_file(self.test_file_name) as fd:
+            fd.write(content)
+
+    def tearDown(self):
+        for name in (self.test_file_name, lines_offsets_path(self.test_file_name)):
+            if os.path.exists(name):
+                remove(name)
+
+    def test_same_as_offset_iter(self):
+        for content in self.contents:
+            self.write(content)
+
+            with binary_file(self.test_file_name) as fd:
+                expected = [offset for offset, _ in offset_iter(fd)]
+
+            with binary_file(self.test_file_name) as fd:
+                result = lines_offsets(fd, 3)
+
+            self.assertListEqual(expected, list(result), content)
+
+    def test_save_load(self):
+        self.write(self.contents[3])
+        self.assertIsNone(load_lines_offsets(self.test_file_name))
+
+        with binary_file(self.test_file_name) as fd:
+            offsets = lines_offsets(fd)
+
+        save_lines_offsets(self.test_file_name, offsets)
+        self.assertEqual(offsets, load_lines_offsets(self.test_file_name))
+
+    def test_stale_index(self):
+        self.write(self.contents[3])
+
+        with binary_file(self.test_file_name) as fd:
+            save_lines_offsets(self.test_file_name, lines_offsets(fd))
+
+        self.write(self.contents[4])
+        self.assertIsNone(load_lines_offsets(self.test_file_name))
+
+
+class TestLineIndexedFile(unittest.TestCase):
+
+    test_file_name = 'LineIndexedFileTest.txt'
+    lines = [u'{:04d}'.format(i) for i in range(100)]
+
+    def write(self, lines, mode='wb'):
+        with open(self.test_file_name, mode) as fd:
+            fd.write(''.join(line + '\n' for line in lines).encode('ascii'))
+
+    def setUp(self):
+        self.write(self.lines)
+
+    def tearDown(self):
+        for name in (self.test_file_name, lines_offsets_path(self.test_file_name)):
+            if os.path.exists(name):
+                remove(name)
+
+    def test_access(self):
+        with LineIndexedFile(self.test_file_name, block_size=16) as f:
+            self.assertEqual(self.lines[5], f[5])
+            self.assertEqual(self.lines[-1], f[-1])
+            self.assertListEqual(self.lines[10:20:3], f[10:20:3])
+            self.assertListEqual(self.lines, list(f))
+            self.assertListEqual(self.lines[::-1], list(reversed(f)))
+            self.assertEqual(len(self.lines), len(f))
+
+            with self.assertRaises(IndexError):
+                _ = f[len(self.lines)]
+
+    def test_lazy(self):
+        with LineIndexedFile(self.test_file_name, block_size=16) as f:
+            self.assertEqual(self.lines[2], f[2])
+            self.assertLess(f._scanned, 20)
+
+    def test_lazy_slice(self):
+        with LineIndexedFile(self.test_file_name, block_size=16) as f:
+            self.assertListEqual(self.lines[0:2], f[0:2])
+            self.assertListEqual(self.lines[3:1:-1], f[3:1:-1])
+            self.assertListEqual(self.lines[:4], f[:4])
+            self.assertLess(f._scanned, 40)
+
+            self.assertListEqual(self.lines[98:200], f[98:200])
+            self.assertListEqual(self.lines[5::-2], f[5::-2])
+            self.assertListEqual(self.lines[-3:], f[-3:])
+
+    def test_keepends(self):
+        with LineIndexedFile(self.test_file_name, True) as f:
+            self.assertEqual(self.lines[0] + '\n', f[0])
+
+    def test_grown(self):
+        with LineIndexedFile(self.test_file_name) as f:
+            self.assertEqual(len(self.lines), len(f))
+
+            self.write([u'tail'], 'ab')
+            self.assertEqual(u'tail', f[len(self.lines)])
+            self.assertEqual(len(self.lines) + 1, len(f))
+
+    def test_saved_index(self):
+        with LineIndexedFile(self.test_file_name) as f:
+            f.save_index()
+
+        with LineIndexedFile(self.test_file_name) as f:
+            self.assertEqual(len(self.lines), len(f._offsets))
+            self.assertEqual(self.lines[-1], f[-1])
+            self.assertEqual(len(self.lines), len(f))
+
+    def test_empty(self):
+        self.write([])
+
+        with LineIndexedFile(self.test_file_name) as f:
+            self.assertEqual(0, len(f))
+            self.assertListEqual([], list(f))
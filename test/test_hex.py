@@ -30,8 +30,10 @@
 
 """Tests for utl.hex"""
 
+import array
 import unittest
 import binascii
+from os import remove
 
 from utl.hex import *
 
@@ -72,6 +74,17 @@ class TestBytesListToBin(unittest.TestCase):
         with self.assertRaises(UnicodeEncodeError):
             bytes_list2bin(self.invalid_input_data)
 
+    def test_invalid_input(self):
+        with self.assertRaises(UnicodeEncodeError):
+            bytes_list2bin(iter(self.invalid_input_data))
+
+        with self.assertRaises(ValueError) as cm:
+            bytes_list2bin([1, -1])
+        self.assertIs(ValueError, type(cm.exception))
+
+        with self.assertRaises(TypeError):
+            bytes_list2bin(5)
+
 
 class TestBytesListToHexStr(unittest.TestCase):
 
@@ -96,6 +109,29 @@ class TestBytesListToHexStr(unittest.TestCase):
             bytes_list2hexstr(self.invalid_input_data)
 
 
+class TestHexStrToBin(unittest.TestCase):
+
+    def test_ok(self):
+        self.assertEqual(b'\xdd\xff\xaa3', hexstr2bin('DDFFAA33'))
+
+    def test_malformed(self):
+        with self.assertRaises(binascii.Error):
+            hexstr2bin('DDFFAA3')
+
+
+class TestBinToHexStr(unittest.TestCase):
+
+    expected_result = 'DDFFAA33'
+
+    def test_buffers(self):
+        data = b'\xdd\xff\xaa3'
+        for buf in (data, bytearray(data), memoryview(data), array.array('B', data)):
+            self.assertEqual(self.expected_result, bin2hexstr(buf))
+
+    def test_lower_case(self):
+        self.assertEqual(self.expected_result.lower(), bin2hexstr(b'\xdd\xff\xaa3', False))
+
+
 class TestIsHexString(unittest.TestCase):
 
     valid_hex_str = 'DDFFAA33'
@@ -107,6 +143,19 @@ class TestIsHexString(unittest.TestCase):
     def test_false(self):
         self.assertFalse(is_hexstr(self.invalid_hex_str))
 
+    def test_odd_length(self):
+        self.assertFalse(is_hexstr(self.valid_hex_str[:-1]))
+
+    def test_bytes(self):
+        self.assertTrue(is_hexstr(self.valid_hex_str.encode('ascii')))
+
+    def test_not_string(self):
+        self.assertFalse(is_hexstr(None))
+
+    def test_bulk(self):
+        result = are_hexstr([self.valid_hex_str, self.invalid_hex_str, '', 'ddf'])
+        self.assertListEqual([True, False, True, False], result)
+
 
 class TestSwapNibbles(unittest.TestCase):
 
@@ -128,3 +177,162 @@ class TestSwapNibbles(unittest.TestCase):
         result = swap_nibbles(self.not_hex_valid_input)
         self.assertEqual(self.not_hex_expected_result, result)
 
+    def test_not_ascii_input(self):
+        result = swap_nibbles(u'\u0444\u0430\u0439\u043b')
+        self.assertEqual(u'\u0430\u0444\u043b\u0439', result)
+
+
+class TestSwapNibblesBin(unittest.TestCase):
+
+    input_data = b'\x98\x10\x32'
+    expected_result = b'\x89\x01\x23'
+
+    def test_ok(self):
+        self.assertEqual(self.expected_result, swap_nibbles_bin(self.input_data))
+        self.assertEqual(bytearray(self.expected_result), swap_nibbles_bin(bytearray(self.input_data)))
+        self.assertEqual(self.expected_result, swap_nibbles_bin(memoryview(self.input_data)))
+
+    def test_inplace(self):
+        buf = bytearray(b'\x00' + self.input_data)
+        swap_nibbles_inplace(memoryview(buf)[1:])
+        self.assertEqual(b'\x00' + self.expected_result, buf)
+
+        swap_nibbles_inplace(buf)
+        self.assertEqual(b'\x00' + self.input_data, buf)
+
+
+class TestBatchConversion(unittest.TestCase):
+
+    hexstrs = ['DDFF', '', 'AA33', '01']
+    buffers = [b'\xdd\xff', b'', b'\xaa3', b'\x01']
+
+    def test_hexstrs2bin(self):
+        data, offsets = hexstrs2bin(self.hexstrs)
+
+        self.assertEqual(b''.join(self.buffers), data)
+        self.assertListEqual([0, 2, 2, 4, 5], list(offsets))
+        self.assertListEqual(self.buffers, [bytes(b) for b in split_by_offsets(data, offsets)])
+
+    def test_hexstrs2bin_bytes(self):
+        data, offsets = hexstrs2bin([s.encode('ascii') for s in self.hexstrs])
+
+        self.assertEqual(b''.join(self.buffers), data)
+
+    def test_hexstrs2bin_odd_length(self):
+        with self.assertRaises(binascii.Error):
+            hexstrs2bin(['DDF', 'F'])
+
+    def test_bins2hexstrs(self):
+        text, offsets = bins2hexstrs(self.buffers)
+
+        self.assertListEqual(self.hexstrs, list(split_by_offsets(text, offsets)))
+
+    def test_empty(self):
+        self.assertEqual((b'', array.array('Q', [0])), hexstrs2bin([]))
+
+
+class TestHexDump(unittest.TestCase):
+
+    data = b'Hello, world!\n\x00\xff'
+    expected_result = [
+        '00000010: 48 65 6c 6c 6f 2c 20 77  Hello, w',
+        '00000018: 6f 72 6c 64 21 0a 00 ff  orld!...',
+    ]
+    test_file_name = 'HexDumpTest.bin'
+
+    def test_ok(self):
+        result = list(hexdump(self.data, 8, 0x10))
+        self.assertListEqual(self.expected_result, result)
+
+    def test_short_line(self):
+        result = list(hexdump(self.data[:3], 4, uppercase=True))
+        self.assertListEqual(['00000000: 48 65 6C     Hel'], result)
+
+    def test_file(self):
+        with open(self.test_file_name, 'wb') as fd:
+            fd.write(b'\x00' * 0x10 + self.data + b'\x00' * 0x10)
+
+        try:
+            with open(self.test_file_name, 'rb') as fd:
+                result = list(hexdump_file(fd, 0x10, 0x20, 8, block_size=3))
+        finally:
+            remove(self.test_file_name)
+
+        self.assertListEqual(self.expected_result, result)
+
+
+class TestHexEncoder(unittest.TestCase):
+
+    def test_plain(self):
+        result = ''.join(hex_encode_stream([b'\xdd\xff', b'', b'\xaa3']))
+        self.assertEqual('DDFFAA33', result)
+
+    def test_formatted(self):
+        result = ''.join(hex_encode_stream([b'\xdd', b'\xff\xaa3\x01'], False, ', ', 3))
+        self.assertEqual('dd, ff, aa\n33, 01\n', result)
+
+    def test_separated(self):
+        result = ''.join(hex_encode_stream([b'\x01\x02', b'', b'\x03', b'\x04\x05'], sep=' '))
+        self.assertEqual('01 02 03 04 05', result)
+
+
+class TestHexDecoder(unittest.TestCase):
+
+    def test_ok(self):
+        result = b''.join(hex_decode_stream(['D', 'DF F\nA', b'A3', '3 ']))
+        self.assertEqual(b'\xdd\xff\xaa3', result)
+
+    def test_odd_length(self):
+        with self.assertRaises(binascii.Error):
+            list(hex_decode_stream(['DDF']))
+
+    def test_separated(self):
+        result = b''.join(hex_decode_stream(['DD:F', 'F:\nAA:33'], ':'))
+        self.assertEqual(b'\xdd\xff\xaa3', result)
+
+    def test_hex_separator(self):
+        self.assertRaises(ValueError, HexDecoder, 'x0')
+
+
+class TestHexFile(unittest.TestCase):
+
+    bin_file_name = 'HexFileTest.bin'
+    hex_file_name = 'HexFileTest.txt'
+    data = bytes(bytearray(range(256)))
+
+    def tearDown(self):
+        for name in (self.bin_file_name, self.hex_file_name):
+            remove(name)
+
+    def test_round_trip(self):
+        with open(self.bin_file_name, 'wb') as fd:
+            fd.write(self.data)
+
+        hex_encode_file(self.bin_file_name, self.hex_file_name, 7, sep=' ', width=16)
+
+        with open(self.hex_file_name) as fd:
+            self.assertEqual(bin2hexstr(self.data[:16]), fd.readline().replace(' ', '').strip())
+
+        hex_decode_file(self.hex_file_name, self.bin_file_name, 5)
+
+        with open(self.bin_file_name, 'rb') as fd:
+            self.assertEqual(self.data, fd.read())
+
+    def test_round_trip_separated(self):
+        with open(self.bin_file_name, 'wb') as fd:
+            fd.write(self.data)
+
+        hex_encode_file(self.bin_file_name, self.hex_file_name, 7, sep=':', width=16)
+        hex_decode_file(self.hex_file_name, self.bin_file_name, 5, ':')
+
+        with open(self.bin_file_name, 'rb') as fd:
+            self.assertEqual(self.data, fd.read())
+
+    def test_separated(self):
+        with open(self.bin_file_name, 'wb') as fd:
+            fd.write(self.data[:10])
+
+        hex_encode_file(self.bin_file_name, self.hex_file_name, 4, sep=' ')
+
+        with open(self.hex_file_name) as fd:
+            self.assertEqual('00 01 02 03 04 05 06 07 08 09', fd.read())
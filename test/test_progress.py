@@ -0,0 +1,181 @@
+#!/usr/bin/env python 
+# -*- coding: UTF-8 -*-
+# ------------------------------------------------------------------------------
+# Name:    test_progress.py   
+# Package: test
+# Project: python-utl
+# 
+# Created: 17.10.2026 12:10   
+# License: The MIT License
+# ------------------------------------------------------------------------------
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE. 
+# ------------------------------------------------------------------------------
+
+"""Tests for utl.progress"""
+
+import io
+import json
+import unittest
+from os import remove
+
+from utl.files import filelist_processor
+from utl.progress import *
+
+
+class TestCallbackSink(unittest.TestCase):
+    def test_ok(self):
+        events = []
+        sink = CallbackSink(events.append)
+
+        sink.send(('a', 1, 2, 1))
+        sink.send(5)
+        sink.send(('a', 2, 2, 2, 10))
+
+        self.assertEqual(3, len(events))
+        self.assertDictEqual({'name': 'a', 'read': 1, 'lines_total': 2, 'processed': 1, 'bytes_read': None,
+                              'saved': 0}, events[0])
+        self.assertDictEqual({'name': 'a', 'read': 1, 'lines_total': 2, 'processed': 1, 'bytes_read': None,
+                              'saved': 5}, events[1])
+        self.assertDictEqual({'name': 'a', 'read': 2, 'lines_total': 2, 'processed': 2, 'bytes_read': 10,
+                              'saved': 5}, events[2])
+
+    def test_saved_last(self):
+        events = []
+
+        with CallbackSink(events.append) as sink:
+            sink.send(('a', 1, 1, 1))
+            sink.send(10)
+
+        self.assertEqual(2, len(events))
+        self.assertEqual(('a', 10), (events[-1]['name'], events[-1]['saved']))
+
+
+class TestJsonLinesSink(unittest.TestCase):
+    def test_ok(self):
+        fd = io.StringIO()
+
+        with JsonLinesSink(fd) as sink:
+            sink.send(('a', 1, None, 1))
+            sink.send(('b', 3, 3, 2))
+
+        events = [json.loads(line) for line in fd.getvalue().splitlines()]
+
+        self.assertListEqual(['a', 'b'], [e['name'] for e in events])
+        self.assertIsNone(events[0]['lines_total'])
+        self.assertEqual(2, events[1]['processed'])
+        self.assertIn('time', events[0])
+
+
+class TestPrometheusTextfileSink(unittest.TestCase):
+
+    test_file_name = 'PrometheusTextfileSinkTest.prom'
+
+    def tearDown(self):
+        remove(self.test_file_name)
+
+    def test_ok(self):
+        with PrometheusTextfileSink(self.test_file_name) as sink:
+            sink.send(('a.txt', 1, 10, 1))
+            sink.send(('a.txt', 5, 10, 4))
+            sink.send(('b"c', 2, None, 2))
+            sink.send(7)
+
+        with open(self.test_file_name) as fd:
+            lines = fd.read().splitlines()
+
+        self.assertIn('utl_lines_read{file="a.txt"} 5', lines)
+        self.assertIn('utl_lines_total{file="a.txt"} 10', lines)
+        self.assertIn('utl_lines_processed{file="b\\"c"} 2', lines)
+        self.assertIn('utl_lines_saved 7', lines)
+        self.assertNotIn('utl_lines_total{file="b\\"c"}', ' '.join(lines))
+
+
+class TestBufferedSink(unittest.TestCase):
+    def test_coalesced(self):
+        events = []
+        sink = BufferedSink(CallbackSink(events.append), interval=60)
+
+        for i in range(1, 1001):
+            sink.send(('a', i, 1000, i))
+
+        sink.send(3)
+        sink.send(('b', 1, 1, 1))
+        sink.close()
+
+        self.assertEqual(3, len(events))
+        self.assertEqual(('a', 1000), (events[0]['name'], events[0]['read']))
+        self.assertEqual(('b', 0), (events[1]['name'], events[1]['saved']))
+        self.assertEqual(('b', 3), (events[2]['name'], events[2]['saved']))
+
+    def test_background_flush(self):
+        events = []
+        sink = BufferedSink(CallbackSink(events.append), interval=0.001)
+        sink.send(('a', 1, 1, 1))
+
+        for _ in range(1000):
+            if events:
+                break
+            sink._stop.wait(0.01)
+
+        sink.close()
+
+        self.assertEqual(1, len(events))
+
+    def test_error(self):
+        def fail(event):
+            raise ValueError(event['name'])
+
+        class ClosedSink(CallbackSink):
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        sink = BufferedSink(ClosedSink(fail), interval=0.001)
+        sink.send(('a', 1, 1, 1))
+        sink._thread.join(10)
+
+        self.assertRaises(ValueError, sink.close)
+        self.assertTrue(sink.sink.closed)
+
+
+class TestFilelistProcessor(unittest.TestCase):
+
+    test_file_name = 'ProgressSinkTest.txt'
+
+    def setUp(self):
+        with open(self.test_file_name, 'w') as fd:
+            fd.write('1\n2\n3\n')
+
+    def tearDown(self):
+        remove(self.test_file_name)
+
+    def test_ok(self):
+        events = []
+
+        with BufferedSink(CallbackSink(events.append), interval=60) as sink:
+            result = list(filelist_processor([self.test_file_name], lambda line: line, progress_co=sink))
+
+        self.assertEqual(3, len(result))
+        self.assertEqual(1, len(events))
+        self.assertEqual((3, 3), (events[0]['read'], events[0]['processed']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -60,6 +60,23 @@ class TestChunk(unittest.TestCase):
         result = list(chunk(*self.input_data3))
         self.assertListEqual(self.expected_result3, result)
 
+    def test_bytes(self):
+        result = chunk(self.text1.encode('ascii'), 4)
+        self.assertListEqual([s.encode('ascii') for s in self.expected_result2], result)
+
+    def test_lazy(self):
+        result = ichunk(self.text1, 4)
+        self.assertListEqual(self.expected_result2, list(result))
+
+    def test_view(self):
+        data = bytearray(self.text1.encode('ascii'))
+        result = chunk_view(data, 4)
+        data[0:1] = b'x'
+
+        self.assertIsInstance(result[0], memoryview)
+        self.assertEqual(b'xaab', result[0].tobytes())
+        self.assertListEqual([b'bbcc', b'cddd', b'eee'], [m.tobytes() for m in result[1:]])
+
 
 class TestLinesStripped(unittest.TestCase):
 
@@ -98,6 +115,31 @@ class TestLinesUncommented(unittest.TestCase):
         self.assertListEqual(self.expected_result2, result)
 
 
+class TestLinesCleaned(unittest.TestCase):
+
+    input_data1 = [' aaa ', '', ' ; bbb', '\t#ccc\n', '  \n', 'ddd']
+    expected_result1 = ['aaa', 'ddd']
+    input_data2 = (['__aaa__', '_', '** bbb', '*ccc*'], '_', ('**', ))
+    expected_result2 = ['aaa', '*ccc*']
+
+    def test_default(self):
+        result = list(lines_cleaned(self.input_data1))
+        self.assertListEqual(self.expected_result1, result)
+
+    def test_customized(self):
+        result = list(lines_cleaned(*self.input_data2))
+        self.assertListEqual(self.expected_result2, result)
+
+    def test_text(self):
+        result = text_cleaned('\n'.join(self.input_data1))
+        self.assertListEqual(self.expected_result1, result)
+
+    def test_bytes(self):
+        input_data = [s.encode('ascii') for s in self.input_data1]
+        result = list(lines_cleaned(input_data, comments=BYTES_COMMENTS))
+        self.assertListEqual([s.encode('ascii') for s in self.expected_result1], result)
+
+
 def parse_line(line):
     if line.startswith(' '):
         return None
@@ -128,6 +170,60 @@ class TestLinesParser(unittest.TestCase):
         self.assertListEqual(self.expected_result2, result)
 
 
+class TestLinesCountedParser(unittest.TestCase):
+
+    input_data = ('', 'aaa', ' ccc', 'bbb', ' ddd')
+    expected_result = [False, True, True]
+    expected_stats = [
+        ParseStats(read=1, processed=1),
+        ParseStats(read=2, processed=2),
+        ParseStats(read=4, processed=3),
+    ]
+
+    def test_ok(self):
+        counters = ParseCounters()
+        result, stats = [], []
+
+        for res in lines_counted_parser(self.input_data, parse_line, counters):
+            result.append(res)
+            stats.append(counters.stats())
+
+        self.assertListEqual(self.expected_result, result)
+        self.assertListEqual(self.expected_stats, stats)
+        self.assertEqual(ParseStats(read=5, processed=3), counters.stats())
+
+    def test_continued(self):
+        counters = ParseCounters()
+        list(lines_counted_parser(self.input_data, parse_line, counters))
+        list(lines_counted_parser(self.input_data, parse_line, counters))
+
+        self.assertEqual(ParseStats(read=10, processed=6), counters.stats())
+
+
+class TestLinesBatchParser(unittest.TestCase):
+
+    input_data = ('', 'aaa', ' ccc', 'bbb', ' ddd')
+    expected_result1 = [
+        (ParseStats(read=2, processed=2), [False, True]),
+        (ParseStats(read=4, processed=3), [True]),
+    ]
+    expected_result2 = [
+        (ParseStats(read=5, processed=3), [False, True, True]),
+    ]
+
+    @staticmethod
+    def parse_lines(lines):
+        return [parse_line(line) for line in lines]
+
+    def test_batches(self):
+        result = list(lines_batch_parser(self.input_data, self.parse_lines, 2))
+        self.assertListEqual(self.expected_result1, result)
+
+    def test_single_batch(self):
+        result = list(lines_batch_parser(self.input_data, self.parse_lines))
+        self.assertListEqual(self.expected_result2, result)
+
+
 class TestProcessCo(unittest.TestCase):
 
     input1 = ('file.txt', 3, 7, 1)
@@ -155,3 +251,41 @@ class TestProcessCo(unittest.TestCase):
         with redirect_stdout(stdout):
             self.progress.send(self.input3)
             self.assertEqual(stdout.getvalue(), self.expected3)
+
+    def test_unknown_total(self):
+        stdout = StringIO()
+        with redirect_stdout(stdout):
+            self.progress.send(('file.txt', 3, None, 1))
+            self.assertEqual(stdout.getvalue(), '\rfile.txt 3/? (processed: 1)  Lines saved: 0')
+
+    def draws(self, progress, updates, close=False):
+        stdout = StringIO()
+        with redirect_stdout(stdout):
+            for info in updates:
+                progress.send(info)
+
+            if close:
+                progress.close()
+
+        return stdout.getvalue()
+
+    def test_throttled_by_count(self):
+        output = self.draws(progress_co(0, every=10), [('file.txt', i, 100, i) for i in range(1, 101)], True)
+
+        self.assertEqual(11, output.count('\r'))
+        self.assertTrue(output.endswith('file.txt 100/100 (processed: 100)  Lines saved: 0'))
+
+    def test_throttled_by_time(self):
+        progress = progress_co(0, interval=3600)
+        output = self.draws(progress, [('file.txt', i, 100, i) for i in range(1, 101)] + [('file2.txt', 1, 10, 101)])
+
+        self.assertEqual(3, output.count('\r'))
+        self.assertIn('\rfile.txt 100/100 (processed: 100)  Lines saved: 0 Done!', output)
+
+        output = self.draws(progress, [('file2.txt', 2, 10, 102)], True)
+        self.assertEqual('\rfile2.txt 2/10 (processed: 102)  Lines saved: 0', output)
+
+    def test_speed(self):
+        output = self.draws(progress_co(0, speed=True), [('file.txt', 0, 100, 0), ('file.txt', 10, 100, 10, 1024)])
+
+        self.assertRegex(output, r'Lines saved: 0  \d+ lines/s \d+\.\d MB/s ETA \d+:\d\d:\d\d$')
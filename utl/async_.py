@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# ------------------------------------------------------------------------------
+# Name:    async_.py
+# Package: utl
+# Project: utl
+#
+# Created: 17.10.26 12:10
+# License: The MIT License
+# ------------------------------------------------------------------------------
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ------------------------------------------------------------------------------
+
+
+"""asyncio utilities. Python 3.6+ only"""
+
+import asyncio
+import collections
+import inspect
+import itertools
+import os
+import sys
+
+from . import files
+from .files import _FileFollower, file_lines_count
+from .text import ParseStats
+
+__author__ = 'Constantin Roganov'
+
+
+def _take(iterator, n):
+    return list(itertools.islice(iterator, n))
+
+
+async def _iterate(iterator, batch_size):
+    """Asynchronous generator of items of a blocking iterator which is advanced in the default executor
+    by batch_size items at once.
+    """
+    loop = asyncio.get_event_loop()
+
+    while True:
+        batch = await loop.run_in_executor(None, _take, iterator, batch_size)
+        if not batch:
+            return
+
+        for item in batch:
+            yield item
+
+
+def reverse_lines(fd, keepends=False, block_size=64 * 1024, encoding='ascii', separator=b'\n', batch_size=1024):
+    """Asynchronous generator of the lines of a file in reverse order.
+
+    Same as utl.files.reverse_lines() but the file is read in the default executor by batch_size lines at once.
+    """
+    return _iterate(files.reverse_lines(fd, keepends, block_size, encoding, separator), batch_size)
+
+
+def offset_iter(fd, batch_size=1024):
+    """Asynchronous generator of pairs (offset_from_beginning_of_file, string) for file object 'fd'.
+
+    Same as utl.files.offset_iter() but the file is read in the default executor by batch_size lines at once.
+    """
+    return _iterate(files.offset_iter(fd), batch_size)
+
+
+async def lines_parser(aiterable, parse_line):
+    """Asynchronous generator of pairs:
+
+        - ParseStats
+        - result of applying parse_line() function to text line from asynchronous iterable aiterable.
+
+    parse_line() can be a coroutine function. Same as utl.text.lines_parser() otherwise.
+    """
+
+    read = processed = 0
+
+    async for line in aiterable:
+        read += 1
+
+        res = parse_line(line)
+        if inspect.isawaitable(res):
+            res = await res
+
+        if res is not None:
+            processed += 1
+            yield ParseStats(read, processed), res
+
+
+async def _stripped(aiterable):
+    async for line in aiterable:
+        yield line.strip()
+
+
+async def filelist_processor(iterable, parse_line, progress_co=None, lines_count=file_lines_count, binary=False,
+                             batch_size=1024):
+    """Asynchronous generator of parsed lines from each text file (path) in iterable.
+
+    Same as utl.files.filelist_processor() but the files are opened, counted and read in the default executor
+    (by batch_size lines at once), and parse_line() can be a coroutine function.
+    """
+
+    loop = asyncio.get_event_loop()
+    paths = sys.argv[1:] if iterable is None else [pth.strip() for pth in iterable]
+    processed = 0
+
+    for pth in paths:
+        name = os.path.basename(pth)
+
+        lines_total = None
+        if progress_co is not None and lines_count:
+            lines_total = await loop.run_in_executor(None, lines_count, pth)
+
+        fo = await loop.run_in_executor(None, open, pth, 'rb' if binary else 'r')
+
+        try:
+            stats = None
+            async for stats, data in lines_parser(_stripped(_iterate(iter(fo), batch_size)), parse_line):
+                if progress_co is not None:
+                    progress_co.send((name, stats.read, lines_total, processed + stats.processed))
+
+                yield data
+
+            if stats:
+                processed += stats.processed
+
+        finally:
+            fo.close()
+
+
+def follow(filename, offset=None, keepends=False, encoding='ascii', min_interval=0.05, max_interval=1.0,
+           block_size=1024 * 1024):
+    """Asynchronous generator of lines appended to a growing text file like "tail -f".
+
+    Same as utl.files.follow() but new data is read in the default executor and idle file is polled
+    with asyncio.sleep(). aclose() closes the file.
+    """
+
+    return _FollowIterator(_FileFollower(filename, offset, keepends, encoding, min_interval, max_interval, block_size))
+
+
+class _FollowIterator(object):
+    """Asynchronous iterator of follow(). Unlike an asynchronous generator, aclose() closes the file even if
+    the iteration hasn't started
+    """
+
+    def __init__(self, follower):
+        self._follower = follower
+        self._lines = collections.deque()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        loop = asyncio.get_event_loop()
+
+        while not self._lines:
+            if self._follower.closed:
+                raise StopAsyncIteration
+
+            lines = await loop.run_in_executor(None, self._follower.read_lines)
+            if not lines:
+                await asyncio.sleep(self._follower.interval)
+
+            self._lines.extend(lines)
+
+        return self._lines.popleft()
+
+    async def aclose(self):
+        self._follower.close()
+
+    def __del__(self):
+        self._follower.close()
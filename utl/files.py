@@ -31,14 +31,27 @@
 
 """File related utilities"""
 
-from __future__ import absolute_import, unicode_literals, print_function
+from __future__ import absolute_import, unicode_literals, print_function, division
 from builtins import *
 
 import os
+import array
+import collections
+import concurrent.futures
+import contextlib
 import fileinput
 import functools
+import itertools
+import json
+import math
+import mmap
+import multiprocessing
+import sys
+import threading
+import time
+import zlib
 
-from .text import lines_parser, lines_stripped
+from .text import ParseCounters, lines_counted_parser, lines_stripped
 
 __author__ = 'Constantin Roganov'
 
@@ -59,33 +72,250 @@ utf8_bom_text_file = functools.partial(open, mode='r', encoding='utf_8_sig')
 utf8_bom_text_file.__doc__ = 'Open UTF8 text file with BOM for reading'
 
 
-def file_lines_count(filename):
-    """Count lines in a text file"""
+_LINES_COUNT_BUF_SIZE = 1024 * 1024
+
+
+def _text_newlines_count(filename):
+    """Count newlines in a file opened in text mode (every byte gets decoded)"""
 # source:
 #  http://stackoverflow.com/questions/845058/how-to-get-line-count-cheaply-in-python
 
     with open(filename) as fo:
         lines = 0
-        buf_size = 1024 * 1024
         read_f = fo.read  # loop optimization
 
-        file_has_data = False
-
-        buf = read_f(buf_size)
-        if buf:
-            file_has_data = True
-
+        buf = read_f(_LINES_COUNT_BUF_SIZE)
         while buf:
             lines += buf.count('\n')
-            buf = read_f(buf_size)
+            buf = read_f(_LINES_COUNT_BUF_SIZE)
+
+    return lines
+
+
+def _buffer_newlines_count(filename):
+    """Count b'\\n' in a binary file read with readinto() into a single reusable buffer"""
+
+    with binary_file(filename, buffering=0) as fo:
+        lines = 0
+        buf = bytearray(_LINES_COUNT_BUF_SIZE)
+        readinto = fo.readinto  # loop optimization
+        count = buf.count
+
+        size = readinto(buf)
+        while size:
+            lines += count(b'\n', 0, size)
+            size = readinto(buf)
+
+    return lines
+
+
+def _mmap_newlines_count(filename):
+    """Count b'\\n' in a memory mapped file"""
+
+    with binary_file(filename) as fo:
+        size = os.fstat(fo.fileno()).st_size
+        if not size:
+            return 0  # empty file can't be mapped
+
+        with contextlib.closing(mmap.mmap(fo.fileno(), 0, access=mmap.ACCESS_READ)) as mm:
+            return sum(mm[i:i + _LINES_COUNT_BUF_SIZE].count(b'\n')
+                       for i in range(0, size, _LINES_COUNT_BUF_SIZE))
 
-        # nonempty file has 1 line at least
-        if file_has_data:
-            lines += 1
+
+_NEWLINES_COUNT_BACKENDS = {
+    'text': _text_newlines_count,
+    'buffer': _buffer_newlines_count,
+    'mmap': _mmap_newlines_count,
+}
+
+
+def file_lines_count(filename, backend='text'):
+    """Count lines in a text file.
+
+    backend - one of:
+        'text' - decode the file and count '\\n' (universal newlines are honored)
+        'buffer' - count b'\\n' in raw bytes read with readinto(), no decoding
+        'mmap' - count b'\\n' in a memory mapped file, no decoding
+    """
+    try:
+        newlines_count = _NEWLINES_COUNT_BACKENDS[backend]
+    except KeyError:
+        raise ValueError('file_lines_count: unknown backend {!r}'.format(backend))
+
+    lines = newlines_count(filename)
+
+    # nonempty file has 1 line at least
+    if os.path.getsize(filename):
+        lines += 1
+
+    return lines
+
+
+def _range_newlines_count(filename, start, stop):
+    """Count b'\\n' in the byte range [start, stop) of a file"""
+
+    with binary_file(filename, buffering=0) as fo:
+        fo.seek(start)
+
+        lines = 0
+        buf = bytearray(min(_LINES_COUNT_BUF_SIZE, stop - start))
+        readinto = fo.readinto  # loop optimization
+        count = buf.count
+
+        left = stop - start
+        while left > 0:
+            size = readinto(buf)
+            if not size:
+                break
+
+            size = min(size, left)
+            lines += count(b'\n', 0, size)
+            left -= size
 
     return lines
 
 
+def _pool_executor(workers, processes):
+    """Return concurrent.futures executor with threads or processes"""
+    if processes:
+        return concurrent.futures.ProcessPoolExecutor(workers)
+
+    return concurrent.futures.ThreadPoolExecutor(workers)
+
+
+def file_lines_count_parallel(filename, workers=None, processes=False, block_size=64 * 1024 * 1024):
+    """Count lines in a text file splitting it into byte ranges of block_size counted in parallel.
+
+    workers - number of pool workers (default depends on CPU count)
+    processes - use a process pool instead of a thread pool. Counting bytes does not release the GIL,
+        so threads parallelize only the I/O.
+    """
+    size = os.path.getsize(filename)
+    if not size:
+        return 0
+
+    starts = range(0, size, block_size)
+    stops = [min(start + block_size, size) for start in starts]
+
+    with _pool_executor(workers, processes) as executor:
+        lines = sum(executor.map(_range_newlines_count, [filename] * len(stops), starts, stops))
+
+    # nonempty file has 1 line at least
+    return lines + 1
+
+
+def files_lines_count(filenames, workers=None, processes=False, backend='buffer'):
+    """Count lines in each file of filenames using a pool of workers.
+
+    Return dict {filename: lines count}.
+    backend - see file_lines_count()
+    """
+    filenames = list(filenames)
+
+    with _pool_executor(workers, processes) as executor:
+        counts = executor.map(file_lines_count, filenames, [backend] * len(filenames))
+
+        return dict(zip(filenames, counts))
+
+
+class LinesCountCache(object):
+    """Persistent LRU cache of file line counts.
+
+    Entries are keyed by file path and validated by (size, mtime, inode). An unchanged file is not read at all,
+    a file which has only grown since it was counted is counted from the last known size.
+    The cache is stored as JSON in filename (if given) on save() or on exit from the with statement.
+    The cache is thread safe, so it can be used with filelist_processor(background=True); a file is read without
+    holding the lock.
+
+    Usage example:
+        with LinesCountCache('lines_count.json') as cache:
+            for data in filelist_processor(paths, parse_line, progress, lines_count=cache):
+                ...
+    """
+
+    _TAIL_SIZE = 4096  # bytes before the counted end of file which must stay intact for appended files
+
+    def __init__(self, filename=None, max_entries=4096):
+        self.filename = filename
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        if filename and os.path.exists(filename):
+            with text_file(filename, encoding='utf-8') as fo:
+                self._entries.update(json.load(fo))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __call__(self, filename):
+        return self.lines_count(filename)
+
+    @staticmethod
+    def _tail_crc(fo, size):
+        start = max(0, size - LinesCountCache._TAIL_SIZE)
+        fo.seek(start)
+        return zlib.crc32(fo.read(size - start)) & 0xffffffff
+
+    def lines_count(self, filename):
+        """Return lines count of a file, reading it only if it has changed since the last call"""
+
+        key = os.path.abspath(filename)
+        st = os.stat(key)
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+        if entry and (entry['inode'], entry['size'], entry['mtime']) == (st.st_ino, st.st_size, st.st_mtime):
+            newlines, tail_crc = entry['newlines'], entry['tail_crc']
+
+        else:
+            with binary_file(key) as fo:
+                if (entry and entry['inode'] == st.st_ino and entry['size'] < st.st_size and
+                        self._tail_crc(fo, entry['size']) == entry['tail_crc']):
+                    # the file was appended, count the new part only
+                    newlines = entry['newlines'] + _range_newlines_count(key, entry['size'], st.st_size)
+                else:
+                    newlines = _buffer_newlines_count(key)
+
+                tail_crc = self._tail_crc(fo, st.st_size)
+
+        with self._lock:
+            self._entries[key] = {
+                'size': st.st_size,
+                'mtime': st.st_mtime,
+                'inode': st.st_ino,
+                'newlines': newlines,
+                'tail_crc': tail_crc,
+            }
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        # nonempty file has 1 line at least
+        return newlines + 1 if st.st_size else 0
+
+    def save(self):
+        """Store the cache into the file it was loaded from"""
+        if not self.filename:
+            return
+
+        with self._lock:
+            entries = collections.OrderedDict(self._entries)
+
+        tmp_name = self.filename + '.tmp'
+        with writable_text_file(tmp_name, encoding='utf-8') as fo:
+            json.dump(entries, fo)
+
+        os.replace(tmp_name, self.filename)
+
+
 def _reverse_blocks_generator(fd, block_size=4096):
     """Return generator which reads file as series of blocks from the tail of file up to to head.
 
@@ -113,29 +343,319 @@ def _reverse_blocks_generator(fd, block_size=4096):
         yield fd.read(block_size)
 
 
-def reverse_lines(fd, keepends=False, block_size=4096, encoding='ascii'):
+def reverse_lines(fd, keepends=False, block_size=4096, encoding='ascii', separator=b'\n'):
     """Iterate through the lines of a file in reverse order.
 
     If keepends is true, line endings are kept as part of the line.
+    separator - single byte terminating the lines. If it is b'\\n' and keepends is false, '\\r' of Windows line endings
+        is removed too. Lines are split in bytes and decoded one by one, so any encoding where separator can't be
+        a part of a multibyte character (like UTF-8) is fine.
     Return generator.
     """
-# source:
-# http://cybervadim.blogspot.ru/2009/10/reverse-file-iterator-in-python.html
+    if len(separator) != 1:
+        raise ValueError('reverse_lines: separator must be a single byte')
+
+    strip_cr = separator == b'\n' and not keepends
+    tail = 1 if keepends else 0  # length of line ending kept as part of the line
+    pieces = []  # parts of the current line from the end to the beginning
+    file_end = True
 
-    buf = ''
     for block in _reverse_blocks_generator(fd, block_size):
-        buf = block.decode(encoding) + buf
-        lines = buf.splitlines(keepends)
-        # Return all lines except the first (since may be partial)
-        if lines:
-            lines.reverse()
-            buf = lines.pop()  # Last line becomes end of new first line.
-            for line in lines:
-                yield line
-    yield buf  # First line.
-
-
-def filelist_processor(iterable, parse_line,  progress_co=None):
+        end = len(block)
+        pos = block.rfind(separator)
+
+        while pos != -1:
+            pieces.append(block[pos + 1:end])
+            line = b''.join(reversed(pieces)) if len(pieces) > 1 else pieces[0]
+            pieces = []
+
+            # a separator at the end of file doesn't start a new line
+            if line or not file_end:
+                if strip_cr and line.endswith(b'\r'):
+                    line = line[:-1]
+
+                yield line.decode(encoding)
+
+            file_end = False
+            end = pos + tail
+            pos = block.rfind(separator, 0, pos)
+
+        pieces.append(block[:end])
+
+    line = b''.join(reversed(pieces))
+    if strip_cr and line.endswith(b'\r'):
+        line = line[:-1]
+
+    yield line.decode(encoding)  # First line.
+
+
+def reverse_lines_mmap(fd, keepends=False, encoding='ascii', separator=b'\n'):
+    """Iterate through the lines of a file in reverse order.
+
+    Same as reverse_lines() but the file is memory mapped and scanned backwards in place, so only the pages holding
+    the lines actually consumed are read. Note that the file must be opened in binary mode.
+    Return generator.
+    """
+    if 'b' not in fd.mode.lower():
+        raise TypeError('File must be opened in binary mode')
+
+    if len(separator) != 1:
+        raise ValueError('reverse_lines_mmap: separator must be a single byte')
+
+    size = os.fstat(fd.fileno()).st_size
+    if not size:
+        yield ''  # empty file can't be mapped
+        return
+
+    strip_cr = separator == b'\n' and not keepends
+    tail = 1 if keepends else 0  # length of line ending kept as part of the line
+
+    with contextlib.closing(mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)) as mm:
+        end = size
+        pos = mm.rfind(separator, 0, end)
+
+        # a separator at the end of file doesn't start a new line
+        if pos == size - 1:
+            end = pos + tail
+            pos = mm.rfind(separator, 0, pos)
+
+        while True:
+            line = mm[pos + 1:end]
+            if strip_cr and line.endswith(b'\r'):
+                line = line[:-1]
+
+            yield line.decode(encoding)
+
+            if pos == -1:
+                break
+
+            end = pos + tail
+            pos = mm.rfind(separator, 0, pos)
+
+
+def tail(filename, n, keepends=False, encoding='ascii', separator=b'\n'):
+    """Return list of the last n lines of a file reading only the pages of memory mapped file it needs"""
+
+    if not os.path.getsize(filename):
+        return []
+
+    with binary_file(filename) as fd:
+        lines = list(itertools.islice(reverse_lines_mmap(fd, keepends, encoding, separator), n))
+
+    lines.reverse()
+    return lines
+
+
+class _FileFollower(object):
+    """Reader of the lines appended to a file which reopens the file if it was rotated or truncated.
+
+    Keeps the polling interval of the file: it is reset to min_interval when new lines appear and doubled
+    (up to max_interval) on each idle poll. At most block_size bytes (or a single longer line) are read per call.
+    """
+
+    def __init__(self, filename, offset=None, keepends=False, encoding='ascii', min_interval=0.05, max_interval=1.0,
+                 block_size=1024 * 1024):
+        self.filename = filename
+        self.keepends = keepends
+        self.encoding = encoding
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.block_size = block_size
+
+        self._fo = binary_file(filename)
+        self._inode = os.fstat(self._fo.fileno()).st_ino
+        self._pending = b''  # incomplete last line
+
+        if offset is None:
+            self._fo.seek(0, os.SEEK_END)
+        else:
+            self._fo.seek(offset)
+
+    @property
+    def closed(self):
+        return self._fo.closed
+
+    def close(self):
+        self._fo.close()
+
+    def _reopen(self):
+        self._fo.close()
+        self._fo = binary_file(self.filename)
+        self._inode = os.fstat(self._fo.fileno()).st_ino
+
+    def read_lines(self):
+        """Return list of complete lines appended to the file since the last call"""
+
+        try:
+            st = os.stat(self.filename)
+        except OSError:
+            st = None  # the file is being rotated, keep reading the old one
+
+        read = functools.partial(self._fo.read, self.block_size)
+
+        if st is not None and st.st_ino != self._inode:
+            data = read()
+
+            if not data:
+                # the rotated file is read to the end, its last line is complete anyway
+                if self._pending:
+                    self._pending += b'\n'
+
+                self._reopen()
+                read = functools.partial(self._fo.read, self.block_size)
+                data = read()
+
+        elif st is not None and st.st_size < self._fo.tell():
+            self._fo.seek(0)  # truncated
+            self._pending = b''
+            data = read()
+
+        elif st is not None and st.st_size == self._fo.tell():
+            return self._idle()
+
+        else:
+            data = read()
+
+        lines = (self._pending + data).split(b'\n')
+
+        while len(lines) == 1 and len(data) == self.block_size:
+            # a line longer than block_size
+            data = read()
+            lines = (lines[0] + data).split(b'\n')
+
+        self._pending = lines.pop()
+
+        if not lines:
+            return self._idle()
+
+        self.interval = self.min_interval
+
+        if self.keepends:
+            return [(line + b'\n').decode(self.encoding) for line in lines]
+
+        return [(line[:-1] if line.endswith(b'\r') else line).decode(self.encoding) for line in lines]
+
+    def _idle(self):
+        self.interval = min(self.interval * 2, self.max_interval)
+        return []
+
+
+def follow(filename, offset=None, keepends=False, encoding='ascii', min_interval=0.05, max_interval=1.0,
+           block_size=1024 * 1024):
+    """Generator of lines appended to a growing text file like "tail -f".
+
+    offset - position to start reading from, the end of file by default
+    block_size - maximum number of bytes read at once, so a big file is followed in constant memory
+    If the file was rotated (its inode changed) or truncated it is reopened and read from the beginning.
+    Idle file is polled with the interval growing from min_interval up to max_interval seconds.
+    The last line is yielded only when it is complete (terminated by '\\n').
+    The file is opened (and the start position is fixed) on call, not on the first iteration, close() of the generator
+    closes it.
+    """
+    return _FollowIterator(_FileFollower(filename, offset, keepends, encoding, min_interval, max_interval, block_size))
+
+
+class _FollowIterator(object):
+    """Iterator of follow(). Unlike a generator, close() closes the file even if the iteration hasn't started"""
+
+    def __init__(self, follower):
+        self._follower = follower
+        self._lines = collections.deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self._lines:
+            if self._follower.closed:
+                raise StopIteration
+
+            lines = self._follower.read_lines()
+            if not lines:
+                time.sleep(self._follower.interval)
+
+            self._lines.extend(lines)
+
+        return self._lines.popleft()
+
+    def close(self):
+        self._follower.close()
+
+    __del__ = close
+
+
+LinesEstimate = collections.namedtuple('LinesEstimate', ('lines', 'line_length', 'low', 'high'))
+
+
+def estimate_lines(filename, samples=16, block_size=64 * 1024):
+    """Estimate lines count of a text file by samples blocks of block_size bytes spread evenly over the file.
+
+    Return LinesEstimate with fields:
+        lines - estimated lines count
+        line_length - average line length in bytes
+        low, high - bounds of lines count with ~95% confidence
+    The cost doesn't depend on the file size. A file smaller than samples * block_size is counted exactly,
+    a bigger one needs samples >= 2 to estimate the bounds.
+    """
+
+    if samples < 1 or block_size < 1:
+        raise ValueError('estimate_lines: samples and block_size must be positive')
+
+    size = os.path.getsize(filename)
+
+    if size <= samples * block_size:
+        lines = file_lines_count(filename, 'buffer')
+        return LinesEstimate(lines, size / lines if lines else 0, lines, lines)
+
+    if samples < 2:
+        raise ValueError('estimate_lines: at least 2 samples are required to estimate the bounds')
+
+    step = (size - block_size) / (samples - 1)
+    densities = []  # newlines per byte
+
+    with binary_file(filename) as fo:
+        for i in range(samples):
+            fo.seek(int(i * step))
+            densities.append(fo.read(block_size).count(b'\n') / block_size)
+
+    density = sum(densities) / samples
+    variance = sum((d - density) ** 2 for d in densities) / (samples - 1)
+    error = 1.96 * math.sqrt(variance / samples) * size
+
+    lines = size * density
+    line_length = 1 / density if density else size
+
+    return LinesEstimate(int(round(lines)) or 1, line_length, max(1, int(lines - error)), int(math.ceil(lines + error)))
+
+
+def file_lines_estimate(filename, samples=16, block_size=64 * 1024):
+    """Estimate lines count of a text file by samples blocks of block_size bytes (see estimate_lines())"""
+    return estimate_lines(filename, samples, block_size).lines
+
+
+def _daemon_future(fn, *args):
+    """Return concurrent.futures.Future of fn(*args) called in a daemon thread.
+    Unlike ThreadPoolExecutor, an abandoned call doesn't delay the interpreter exit.
+    """
+    future = concurrent.futures.Future()
+
+    def run():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+    thread = threading.Thread(target=run, name='lines_count')
+    thread.daemon = True
+    thread.start()
+
+    return future
+
+
+def filelist_processor(iterable, parse_line,  progress_co=None, lines_count=file_lines_count, background=False,
+                       binary=False):
     """Generator of parsed lines from each text file (path) in iterable.
 
     iterable - sequence of file paths or None (there sys.argv[1:] will be used)
@@ -145,27 +665,156 @@ def filelist_processor(iterable, parse_line,  progress_co=None):
         progress_co.send((filename, lines_read, lines_total, lines_processed))
         ...
         progress_co.send(lines_saved)  # finalizing work
+    lines_count - callable returning lines count of a file for the progress (for example LinesCountCache or
+        file_lines_estimate). If None, lines_total is unknown and None is sent instead.
+    background - call lines_count in a background (daemon) thread, lines_total is None until the count is ready.
+        A count of the previous file, which is not ready yet, is abandoned.
+    binary - read files in binary mode and pass bytes lines to parse_line without decoding
 
     Generates output data in format produced by parse_line()
     """
 
     files = None if iterable is None else lines_stripped(iterable)
 
-    inp = fileinput.input(files=files)
+    inp = fileinput.input(files=files, mode='rb' if binary else 'r')
+
+    pth, name, lines_total, total_future = (None, ) * 4
+
+    count_lines = lines_count if progress_co else None
+
+    counters = ParseCounters()
+
+    try:
+        for data in lines_counted_parser(lines_stripped(inp), parse_line, counters):
+            if inp.isfirstline() or inp.filename() != pth:
+                pth = inp.filename()
+                name = os.path.basename(pth)
+
+                if count_lines and background:
+                    total_future = _daemon_future(count_lines, pth)
+                    lines_total = None
+
+                elif count_lines:
+                    lines_total = count_lines(pth)
+
+            if total_future and total_future.done():
+                lines_total = total_future.result()
+                total_future = None
+
+            if progress_co:
+                progress_co.send((name, inp.filelineno(), lines_total, counters.processed))
+
+            yield data
+
+    finally:
+        inp.close()
+
+
+def _parse_file_range(filename, start, stop, parse_line, encoding):
+    """Apply parse_line to the lines of a file which begin in the byte range [start, stop).
+    If encoding is None lines are passed to parse_line as bytes.
+
+    Return pair (lines read, list of results which are not None).
+    """
+    lines_read = 0
+    results = []
+
+    with binary_file(filename) as fo:
+        if start:
+            # skip the rest of a line beginning in the previous range
+            fo.seek(start - 1)
+            fo.readline()
+
+        pos = fo.tell()
+
+        for line in fo:
+            if pos >= stop:
+                break
+
+            pos += len(line)
+            lines_read += 1
+
+            res = parse_line((line if encoding is None else line.decode(encoding)).strip())
+            if res is not None:
+                results.append(res)
+
+    return lines_read, results
+
+
+def filelist_processor_parallel(iterable, parse_line, progress_co=None, lines_count=file_lines_count, ordered=True,
+                                workers=None, block_size=16 * 1024 * 1024, encoding='utf-8', binary=False):
+    """Parallel version of filelist_processor().
+
+    Files are split into ranges of block_size bytes (aligned to the lines boundaries) and parse_line is applied to
+    them by a process pool, so parse_line and its results must be picklable. Progress is sent to progress_co from
+    the calling process after each range, the state tuple has the fifth item - bytes of the file processed.
+    lines_count is called in a background (daemon) thread when the first range of a file is submitted, lines_total
+    is None until the count is ready.
+
+    ordered - yield results in the input order, otherwise as soon as the range is processed
+    workers - number of worker processes (default is CPU count)
+    encoding - text files encoding
+    binary - pass bytes lines to parse_line without decoding
+    """
+
+    files = sys.argv[1:] if iterable is None else lines_stripped(iterable)
+
+    if binary:
+        encoding = None
+
+    ranges = ((pth, start, min(start + block_size, size))
+              for pth, size in ((pth, os.path.getsize(pth)) for pth in files)
+              for start in range(0, size, block_size))
+
+    max_pending = 2 * (workers or multiprocessing.cpu_count())
+    pending = collections.OrderedDict()  # future: (file path, range size), in the order of submission
+    lines_read = collections.Counter()
+    bytes_read = collections.Counter()
+    total_futures = {}  # file path: future of lines_count()
+    processed = 0
+
+    count_lines = lines_count if progress_co is not None else None
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+
+        def submit(count):
+            for pth, start, stop in itertools.islice(ranges, count):
+                pending[executor.submit(_parse_file_range, pth, start, stop, parse_line, encoding)] = pth, stop - start
+
+                if count_lines and pth not in total_futures:
+                    total_futures[pth] = _daemon_future(count_lines, pth)
+
+        try:
+            submit(max_pending)
+
+            while pending:
+                if ordered:
+                    future = next(iter(pending))
+                else:
+                    done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    future = done.pop()
+
+                pth, size = pending.pop(future)
+                read, results = future.result()
+                submit(1)
 
-    pth, name, lines_total = (None, ) * 3
+                processed += len(results)
 
-    for stats, data in lines_parser(lines_stripped(inp), parse_line):
-        if inp.isfirstline() or inp.filename() != pth:
-            pth = inp.filename()
-            name = os.path.basename(pth)
+                if progress_co is not None:
+                    lines_read[pth] += read
+                    bytes_read[pth] += size
 
-            lines_total = file_lines_count(pth)
+                    total_future = total_futures.get(pth)
+                    lines_total = total_future.result() if total_future and total_future.done() else None
 
-        if progress_co:
-            progress_co.send((name, inp.filelineno(), lines_total, stats.processed))
+                    progress_co.send((os.path.basename(pth), lines_read[pth], lines_total, processed, bytes_read[pth]))
 
-        yield data
+                for data in results:
+                    yield data
+
+        finally:
+            for future in pending:
+                future.cancel()
 
 
 def offset_iter(fd):
@@ -188,3 +837,225 @@ def offset_iter(fd):
         yield addr, line
 
 
+def lines_offsets(fd, block_size=1024 * 1024):
+    """Return array('Q') of the offsets from beginning of file of all lines in file object 'fd'.
+
+    Offsets are found by scanning blocks of block_size bytes for b'\\n', so the file must be opened in binary mode.
+    The file is read from its current position (offsets are absolute anyway).
+    """
+    if 'b' not in fd.mode.lower():
+        raise TypeError('File must be opened in binary mode')
+
+    offsets = array.array('Q')
+    append = offsets.append  # loop optimization
+    read = fd.read
+
+    base = fd.tell()
+    block = read(block_size)
+    if block:
+        append(base)
+
+    while block:
+        find = block.find
+        pos = find(b'\n')
+
+        while pos != -1:
+            append(base + pos + 1)
+            pos = find(b'\n', pos + 1)
+
+        base += len(block)
+        block = read(block_size)
+
+    # a newline at the end of file doesn't start a new line
+    if offsets and offsets[-1] == base:
+        offsets.pop()
+
+    return offsets
+
+
+def lines_offsets_path(filename):
+    """Return path of the lines offsets index of a file"""
+    return filename + '.offsets'
+
+
+def save_lines_offsets(filename, offsets):
+    """Save lines offsets of a file to the index next to it (see lines_offsets_path()).
+
+    The index is stored in native byte order together with size and modification time of the file.
+    """
+    st = os.stat(filename)
+
+    with writable_binary_file(lines_offsets_path(filename)) as fo:
+        array.array('Q', (st.st_size, st.st_mtime_ns)).tofile(fo)
+        offsets.tofile(fo)
+
+
+def load_lines_offsets(filename):
+    """Load lines offsets of a file from the index next to it.
+
+    Return array('Q') or None if there is no index or the file was changed after the index was saved.
+    """
+    index_name = lines_offsets_path(filename)
+
+    try:
+        st = os.stat(filename)
+        index_size = os.path.getsize(index_name)
+    except OSError:
+        return None
+
+    offsets = array.array('Q')
+
+    with binary_file(index_name) as fo:
+        offsets.fromfile(fo, index_size // offsets.itemsize)
+
+    if offsets[:2] != array.array('Q', (st.st_size, st.st_mtime_ns)):
+        return None
+
+    return offsets[2:]
+
+
+class LineIndexedFile(object):
+    """Random access to the lines of a text file by their numbers through the memory mapped file.
+
+    Supports len(), indexing (f[i]), slices and reversed(). Lines offsets index is built lazily: the file is scanned
+    only up to the highest line requested so far, and the scan is continued if the file grows (the file is expected
+    to be only appended). If there is a saved index next to the file (see save_lines_offsets()) it is used.
+
+    Usage example:
+        with LineIndexedFile('huge.log') as f:
+            print(f[1000000], f[-1], len(f))
+            last_ten = f[-10:]
+    """
+
+    def __init__(self, filename, keepends=False, encoding='ascii', block_size=1024 * 1024):
+        self.filename = filename
+        self.keepends = keepends
+        self.encoding = encoding
+        self.block_size = block_size
+
+        self._fo = binary_file(filename)
+        self._mm = None
+        self._size = 0
+
+        # starts of the lines found so far and the number of bytes scanned for them, the last start can be
+        # equal to the size of a file ending with b'\\n'
+        self._offsets = load_lines_offsets(filename) or array.array('Q', (0, ))
+        self._scanned = self._offsets[-1]
+
+        self._remap()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+        self._fo.close()
+
+    def _remap(self):
+        """Map the file again if it has grown. Return True if it has"""
+        size = os.fstat(self._fo.fileno()).st_size
+        if size <= self._size:
+            return False
+
+        if self._mm is not None:
+            self._mm.close()
+
+        self._mm = mmap.mmap(self._fo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._size = size
+
+        return True
+
+    def _scan(self, lines=None):
+        """Extend the offsets index up to the end of line number lines (or up to the end of file)"""
+
+        offsets = self._offsets
+        append = offsets.append  # loop optimization
+
+        while lines is None or len(offsets) <= lines + 1:
+            if self._scanned == self._size and not self._remap():
+                break
+
+            end = min(self._scanned + self.block_size, self._size)
+            find = self._mm.find
+            pos = find(b'\n', self._scanned, end)
+
+            while pos != -1:
+                append(pos + 1)
+                pos = find(b'\n', pos + 1, end)
+
+            self._scanned = end
+
+    def _line(self, i):
+        start = self._offsets[i]
+        end = self._offsets[i + 1] if i + 1 < len(self._offsets) else self._size
+
+        line = self._mm[start:end]
+        if not self.keepends and line.endswith(b'\n'):
+            line = line[:-2] if line.endswith(b'\r\n') else line[:-1]
+
+        return line.decode(self.encoding)
+
+    def __len__(self):
+        self._scan()
+
+        offsets = self._offsets
+        return len(offsets) - 1 if offsets[-1] == self._size else len(offsets)
+
+    def _slice_len(self, index):
+        """Return the number of lines enough to resolve slice index. The whole file is scanned only if a bound of
+        the slice is negative or open towards the end of file.
+        """
+        step = 1 if index.step is None else index.step
+        start = 0 if index.start is None and step > 0 else index.start
+        stop = 0 if index.stop is None and step < 0 else index.stop
+
+        if start is None or stop is None or start < 0 or stop < 0:
+            return len(self)
+
+        bound = max(start, stop)
+        self._scan(bound)
+
+        return bound + 1 if len(self._offsets) > bound + 1 else len(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._line(i) for i in range(*index.indices(self._slice_len(index)))]
+
+        if index < 0:
+            index += len(self)
+
+        else:
+            self._scan(index)
+
+        if not 0 <= index < len(self._offsets) or self._offsets[index] == self._size:
+            raise IndexError('LineIndexedFile index out of range')
+
+        return self._line(index)
+
+    def __iter__(self):
+        i = 0
+        while True:
+            try:
+                line = self[i]
+            except IndexError:
+                return
+
+            yield line
+            i += 1
+
+    def __reversed__(self):
+        for i in range(len(self) - 1, -1, -1):
+            yield self._line(i)
+
+    def save_index(self):
+        """Build the whole lines offsets index and save it next to the file (see save_lines_offsets())"""
+        self._scan()
+
+        offsets = self._offsets
+        save_lines_offsets(self.filename, offsets[:-1] if offsets[-1] == self._size else offsets)
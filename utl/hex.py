@@ -35,45 +35,127 @@
 from __future__ import unicode_literals, absolute_import
 from builtins import *
 
+import array
+import functools
+import itertools
+import operator
+import re
 from binascii import hexlify, unhexlify, Error
 
+from .files import binary_file, text_file, writable_binary_file, writable_text_file
+
 
 __author__ = 'Constantin Roganov'
 
 
+def hexstr2bin(hexstr):
+    """Convert the hex string to bytes"""
+    return unhexlify(hexstr)
+
+
+def bin2hexstr(data, uppercase=True):
+    """Convert bytes-like object (bytes, bytearray, memoryview, array('B')...) to hex string"""
+    result = hexlify(data)
+
+    return (result.upper() if uppercase else result).decode('ascii')
+
+
 def hexstr2bytes_list(hexstr):
     """Convert the hex string to list of bytes"""
     if not hexstr:
         raise TypeError("hexstr2bytes_list: input must be a hex string, '{}' received".format(hexstr))
     # python 2
     # return list(map(ord, unhexlify(hexstr)))
-    return [i for i in unhexlify(hexstr)]
+    return list(hexstr2bin(hexstr))
 
 
 def bytes_list2bin(bl):
     """Convert list of bytes to binary string"""
-    return b''.join(chr(i).encode('latin-1') for i in bl)
+    if isinstance(bl, int):
+        raise TypeError("bytes_list2bin: input must be a list of bytes, '{}' received".format(bl))
+
+    if iter(bl) is bl:
+        bl = list(bl)  # the slow path below needs the items again
+
+    try:
+        return bytes(bl)
+
+    except ValueError:
+        # the same exceptions as before: UnicodeEncodeError for i > 255, ValueError for i < 0
+        return b''.join(chr(i).encode('latin-1') for i in bl)
 
 
 def bytes_list2hexstr(bl, uppercase=True):
     """Convert list of bytes to hex string"""
-    # python2
-    # result = hexlify(bytes_list2bin(bl))
-    result = bytes_list2bin(bl).hex()
+    return bin2hexstr(bytes_list2bin(bl), uppercase)
+
+
+def _offsets(lengths, factor=1):
+    """Return array('Q') of offsets of items with lengths stored one by one, multiplied by factor"""
+    ends = itertools.accumulate(lengths)
+    if factor != 1:
+        ends = map(operator.mul, ends, itertools.repeat(factor))
+
+    offsets = array.array('Q', (0, ))
+    offsets.extend(ends)
+
+    return offsets
+
+
+def hexstrs2bin(hexstrs):
+    """Convert each hex string (or bytes) from sequence hexstrs into binary data stored in a single buffer.
+
+    Return pair (bytes, array('Q') of offsets). Data of i-th hex string is data[offsets[i]:offsets[i + 1]].
+    """
+    hex_offsets = _offsets(map(len, hexstrs))
+
+    if any(map(operator.and_, hex_offsets, itertools.repeat(1))):
+        raise Error('Odd-length string')
+
+    joined = ''.join(hexstrs) if hexstrs and isinstance(hexstrs[0], str) else b''.join(hexstrs)
+
+    return unhexlify(joined), array.array('Q', map(operator.floordiv, hex_offsets, itertools.repeat(2)))
+
+
+def bins2hexstrs(buffers, uppercase=True):
+    """Convert each bytes-like object from sequence buffers into hex string stored in a single string.
+
+    Return pair (str, array('Q') of offsets). Hex string of i-th buffer is text[offsets[i]:offsets[i + 1]].
+    """
+    return bin2hexstr(b''.join(buffers), uppercase), _offsets(map(len, buffers), 2)
+
 
-    return result.upper() if uppercase else result
+def split_by_offsets(data, offsets):
+    """Generator of items stored in data (str or bytes-like object) one by one at offsets.
+
+    Items of bytes-like data are memoryview slices, so nothing is copied.
+    """
+    if not isinstance(data, str):
+        data = memoryview(data)
+
+    for start, stop in zip(offsets, itertools.islice(offsets, 1, None)):
+        yield data[start:stop]
+
+
+_HEXSTR_RE = re.compile(r'[0-9A-Fa-f]*\Z')
+_HEXBYTES_RE = re.compile(br'[0-9A-Fa-f]*\Z')
 
 
 def is_hexstr(s):
     """Check a string s for presence a valid hexadecimal data"""
     try:
-        unhexlify(s)
-        return True
+        match = _HEXSTR_RE.match if isinstance(s, str) else _HEXBYTES_RE.match
+        return not len(s) % 2 and match(s) is not None
 
-    except (TypeError, Error):
+    except TypeError:
         return False
 
 
+def are_hexstr(strings):
+    """Check each string from iterable strings for presence a valid hexadecimal data. Return list of bool"""
+    return [is_hexstr(s) for s in strings]
+
+
 def swap_nibbles(s):
     r"""Swap nibbles in a hex string.
     len(s) must be even otherwise ValueError will be raised.
@@ -82,6 +164,212 @@ def swap_nibbles(s):
     """
     if len(s) % 2:
         raise ValueError('Odd-length string')
-    return ''.join([y+x for x,y in zip(*[iter(s)] * 2)])
+
+    try:
+        b = bytearray(s.encode('ascii'))
+
+    except UnicodeEncodeError:
+        return ''.join([y+x for x,y in zip(*[iter(s)] * 2)])
+
+    b[0::2], b[1::2] = b[1::2], b[0::2]
+    return b.decode('ascii')
+
+
+_SWAP_NIBBLES_TABLE = bytes(bytearray(((i & 0x0f) << 4) | (i >> 4) for i in range(256)))
+
+
+def swap_nibbles_bin(data):
+    """Swap nibbles in each byte of bytes-like object data. Return object of the same type for bytes and bytearray
+    and bytes for other types.
+    """
+    if not isinstance(data, (bytes, bytearray)):
+        data = bytes(data)
+
+    return data.translate(_SWAP_NIBBLES_TABLE)
+
+
+def swap_nibbles_inplace(buf):
+    """Swap nibbles in each byte of writable buffer buf (bytearray, memoryview...) in place"""
+    buf[:] = (buf if isinstance(buf, bytearray) else bytes(buf)).translate(_SWAP_NIBBLES_TABLE)
+
+
+_WHITESPACE = b' \t\r\n\v\f'
+
+
+def _hexlify_separated(data, sep, uppercase):
+    """Return hex representation (bytes) of data with sep (bytes) between the bytes"""
+    result = hexlify(data)
+    if uppercase:
+        result = result.upper()
+
+    if not sep or len(data) < 2:
+        return result
+
+    step = 2 + len(sep)
+    out = bytearray(len(data) * step - len(sep))
+    out[0::step] = result[0::2]
+    out[1::step] = result[1::2]
+
+    for i in range(len(sep)):
+        out[2 + i::step] = sep[i:i + 1] * (len(data) - 1)
+
+    return bytes(out)
+
+
+class HexEncoder(object):
+    """Incremental encoder of binary data into hex string.
+
+    uppercase - case of hex digits
+    sep - string inserted between bytes
+    width - number of bytes per line, each line is terminated by '\\n'
+    """
+
+    def __init__(self, uppercase=True, sep='', width=None):
+        self.uppercase = uppercase
+        self.sep = sep.encode('ascii')
+        self.width = width
+        self._column = 0  # bytes written to the current line (to the whole output if width is None)
+
+    def encode(self, data, final=False):
+        """Return hex string for bytes-like object data. The final call completes the last line"""
+        data = memoryview(data)
+        parts = []
+
+        if self._column and self.sep and len(data):
+            parts.append(self.sep)
+
+        if not self.width:
+            parts.append(_hexlify_separated(data, self.sep, self.uppercase))
+            self._column += len(data)
+
+        else:
+            pos = 0
+            while pos < len(data):
+                size = min(self.width - self._column, len(data) - pos)
+                parts.append(_hexlify_separated(data[pos:pos + size], self.sep, self.uppercase))
+
+                pos += size
+                self._column += size
+
+                if self._column == self.width:
+                    parts.append(b'\n')
+                    self._column = 0
+
+                elif pos < len(data) and self.sep:
+                    parts.append(self.sep)
+
+            if final and self._column:
+                parts.append(b'\n')
+                self._column = 0
+
+        return b''.join(parts).decode('ascii')
+
+
+class HexDecoder(object):
+    """Incremental decoder of hex string into bytes.
+
+    Whitespace and the characters of sep (the separator of HexEncoder) are ignored, an odd nibble at the end of
+    a chunk is kept until the next one.
+    """
+
+    def __init__(self, sep=''):
+        sep = sep.encode('ascii')
+        if sep.translate(None, b'0123456789ABCDEFabcdef') != sep:
+            raise ValueError('HexDecoder: separator must not contain hex digits')
+
+        self._ignored = _WHITESPACE + sep
+        self._nibble = b''
+
+    def decode(self, data, final=False):
+        """Return bytes for hex string (or bytes) data. The final call raises binascii.Error if a nibble is left"""
+        if not isinstance(data, bytes):
+            data = data.encode('ascii')
+
+        data = self._nibble + data.translate(None, self._ignored)
+
+        if len(data) % 2:
+            data, self._nibble = data[:-1], data[-1:]
+        else:
+            self._nibble = b''
+
+        if final and self._nibble:
+            raise Error('Odd-length string')
+
+        return unhexlify(data)
+
+
+_PRINTABLE_TABLE = bytes(bytearray(i if 0x20 <= i < 0x7f else ord('.') for i in range(256)))
+
+
+def hexdump(data, width=16, offset=0, uppercase=False):
+    """Generator of xxd-like dump lines (offset, hex bytes, ASCII column) of bytes-like object data.
+
+    width - number of bytes per line
+    offset - address of the first byte of data
+    """
+    data = memoryview(data)
+    hex_width = width * 3 - 1
+
+    # the whole data is formatted at once, lines are just slices of it
+    text = _hexlify_separated(data, b' ', uppercase).decode('ascii')
+    printable = data.tobytes().translate(_PRINTABLE_TABLE).decode('ascii')
+
+    for pos in range(0, len(data), width):
+        yield '{:08x}: {}  {}'.format(
+            offset + pos, text[pos * 3:pos * 3 + hex_width].ljust(hex_width), printable[pos:pos + width]
+        )
+
+
+def hexdump_file(fd, start=0, stop=None, width=16, uppercase=False, block_size=64 * 1024):
+    """Generator of xxd-like dump lines of the range [start, stop) of binary file object fd (see hexdump()).
+
+    The file is read from start in blocks of about block_size bytes, the data before start is not read.
+    """
+    block_size = max(width, block_size // width * width)
+
+    fd.seek(start)
+    pos = start
+
+    while stop is None or pos < stop:
+        block = fd.read(block_size if stop is None else min(block_size, stop - pos))
+        if not block:
+            break
+
+        for line in hexdump(block, width, pos, uppercase):
+            yield line
+
+        pos += len(block)
+
+
+def hex_encode_stream(chunks, uppercase=True, sep='', width=None):
+    """Generator of hex strings for each bytes-like object from iterable chunks (see HexEncoder)"""
+    encoder = HexEncoder(uppercase, sep, width)
+
+    for data in chunks:
+        yield encoder.encode(data)
+
+    yield encoder.encode(b'', True)
+
+
+def hex_decode_stream(chunks, sep=''):
+    """Generator of bytes for each hex string from iterable chunks (see HexDecoder)"""
+    decoder = HexDecoder(sep)
+
+    for data in chunks:
+        yield decoder.decode(data)
+
+    yield decoder.decode(b'', True)
+
+
+def hex_encode_file(src, dst, block_size=1024 * 1024, uppercase=True, sep='', width=None):
+    """Write hex representation of binary file src into text file dst in constant memory"""
+    with binary_file(src) as fi, writable_text_file(dst, encoding='ascii') as fo:
+        for text in hex_encode_stream(iter(functools.partial(fi.read, block_size), b''), uppercase, sep, width):
+            fo.write(text)
 
 
+def hex_decode_file(src, dst, block_size=1024 * 1024, sep=''):
+    """Write binary data from hex text file src into binary file dst in constant memory"""
+    with text_file(src, encoding='ascii') as fi, writable_binary_file(dst) as fo:
+        for data in hex_decode_stream(iter(functools.partial(fi.read, block_size), ''), sep):
+            fo.write(data)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# ------------------------------------------------------------------------------
+# Name:    progress.py
+# Package: utl
+# Project: utl
+#
+# Created: 17.10.26 12:10
+# License: The MIT License
+# ------------------------------------------------------------------------------
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ------------------------------------------------------------------------------
+
+
+"""Progress reporting sinks.
+
+A sink has the same send() API as utl.text.progress_co() generator, so it can be passed to
+utl.files.filelist_processor() as progress_co.
+"""
+
+from __future__ import unicode_literals, absolute_import
+from builtins import *
+
+import collections
+import json
+import os
+import threading
+import time
+
+__author__ = 'Constantin Roganov'
+
+
+class ProgressSink(object):
+    """Base class of progress sinks.
+
+    send() dispatches the progress_co() input: tuple (name, read, lines_total, processed[, bytes_read]) to update()
+    and integer lines_saved to saved(). Subclasses override update(), saved() and flush().
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def send(self, info):
+        # python 2 (long)
+        # if isinstance(info, (int, long)):
+        if isinstance(info, int):
+            self.saved(info)
+        else:
+            self.update(*info)
+
+    def update(self, name, read, lines_total, processed, bytes_read=None):
+        """Process state of file name"""
+
+    def saved(self, lines):
+        """Process number of lines saved"""
+
+    def flush(self):
+        """Export the state received so far"""
+
+    def close(self):
+        self.flush()
+
+
+class CallbackSink(ProgressSink):
+    """Sink calling callback(event) for each update and each lines_saved. event is a dict with keys
+    name, read, lines_total, processed, bytes_read (the last state, None before the first update) and saved (the total).
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._state = (None, ) * 5
+        self._saved = 0
+
+    def _emit(self):
+        event = dict(zip(('name', 'read', 'lines_total', 'processed', 'bytes_read'), self._state))
+        event['saved'] = self._saved
+
+        self.callback(event)
+
+    def update(self, name, read, lines_total, processed, bytes_read=None):
+        self._state = name, read, lines_total, processed, bytes_read
+        self._emit()
+
+    def saved(self, lines):
+        self._saved += lines
+        self._emit()
+
+
+class JsonLinesSink(CallbackSink):
+    """Sink writing each update as a JSON object (see CallbackSink) with additional key time into a text file
+    object fd, one per line.
+    """
+
+    def __init__(self, fd):
+        super(JsonLinesSink, self).__init__(self._write)
+        self.fd = fd
+
+    def _write(self, event):
+        event['time'] = time.time()
+        self.fd.write(json.dumps(event, sort_keys=True) + '\n')
+
+    def flush(self):
+        self.fd.flush()
+
+
+class PrometheusTextfileSink(ProgressSink):
+    """Sink exporting the last state of each file as metrics in Prometheus text format into file filename
+    (for the node exporter textfile collector). The file is rewritten atomically on flush().
+
+    Metrics: <prefix>_lines_read, <prefix>_lines_total, <prefix>_lines_processed with label file,
+        <prefix>_lines_saved.
+    """
+
+    def __init__(self, filename, prefix='utl'):
+        self.filename = filename
+        self.prefix = prefix
+        self._files = collections.OrderedDict()
+        self._saved = 0
+
+    def update(self, name, read, lines_total, processed, bytes_read=None):
+        self._files[name] = (read, lines_total, processed)
+
+    def saved(self, lines):
+        self._saved += lines
+
+    def flush(self):
+        lines = []
+
+        for i, metric in enumerate(('lines_read', 'lines_total', 'lines_processed')):
+            lines.append('# TYPE {}_{} gauge'.format(self.prefix, metric))
+
+            for name, values in self._files.items():
+                if values[i] is not None:
+                    lines.append('{}_{}{{file="{}"}} {}'.format(
+                        self.prefix, metric, name.replace('\\', '\\\\').replace('"', '\\"'), values[i]
+                    ))
+
+        lines.append('# TYPE {}_lines_saved counter'.format(self.prefix))
+        lines.append('{}_lines_saved {}'.format(self.prefix, self._saved))
+
+        tmp_name = self.filename + '.tmp'
+        with open(tmp_name, 'w') as fo:
+            fo.write('\n'.join(lines) + '\n')
+
+        os.replace(tmp_name, self.filename)
+
+
+class BufferedSink(ProgressSink):
+    """Non-blocking wrapper of a slow sink.
+
+    send() only stores the last state of each file, the states are passed to sink by a background thread once in
+    interval seconds (followed by sink.flush()). Exception raised by sink is re-raised by close().
+    close() passes the rest of the states to sink and closes it.
+    """
+
+    def __init__(self, sink, interval=1.0):
+        self.sink = sink
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._forward_lock = threading.Lock()
+        self._states = collections.OrderedDict()
+        self._saved = 0
+        self._error = None
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='BufferedSink')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def send(self, info):
+        with self._lock:
+            if isinstance(info, int):
+                self._saved += info
+            else:
+                self._states[info[0]] = info
+
+    def _forward(self):
+        with self._forward_lock:
+            with self._lock:
+                states, self._states = self._states, collections.OrderedDict()
+                saved, self._saved = self._saved, 0
+
+            for info in states.values():
+                self.sink.update(*info)
+
+            if saved:
+                self.sink.saved(saved)
+
+            self.sink.flush()
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                self._forward()
+
+        except Exception as e:
+            self._error = e
+
+    def flush(self):
+        """Pass the states received so far to sink from the calling thread"""
+        self._forward()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+        try:
+            if self._error is not None:
+                raise self._error
+
+            self._forward()
+
+        finally:
+            self.sink.close()
@@ -41,27 +41,68 @@ if sys.version_info[0] == 2:
     install_aliases()
 
 import collections
+import datetime
 import itertools
+import operator
+from timeit import default_timer as timer
 
 __author__ = 'Constantin Roganov'
 
 
 ParseStats = collections.namedtuple('ParseStats', ('read', 'processed'))
 
+COMMENTS = (';', '#')
+BYTES_COMMENTS = (b';', b'#')  # for the lines read in binary mode
+
 
 def chunk(s, p):
-    """Split string s into sections with size p"""
-    return list(map(''.join, itertools.zip_longest(*[iter(s)] * p, fillvalue='')))
+    """Split string s (str, bytes or memoryview) into sections with size p"""
+    return [s[i:i + p] for i in range(0, len(s), p)]
+
+
+def ichunk(s, p):
+    """Generator of sections with size p of string s (str, bytes or memoryview)"""
+    for i in range(0, len(s), p):
+        yield s[i:i + p]
+
+
+def chunk_view(b, p):
+    """Split bytes-like object b into memoryview sections with size p without copying of data"""
+    return chunk(memoryview(b), p)
 
 
 def lines_stripped(iterable, chars=None):
-    """Return Iterable object containing lines from input iterable with strip(chars) applied"""
-    return map(lambda s: s.strip(chars), iterable)
+    """Return Iterable object containing lines from input iterable with strip(chars) applied.
+
+    Lines can be str or bytes, chars should have the same type.
+    """
+    return map(operator.methodcaller('strip', chars), iterable)
+
+
+def lines_uncommented(iterable, comments=COMMENTS):
+    """Return Iterable object containing only lines from iterable which didn't begin with comment.
+
+    Lines can be str or bytes, comments should have the same type (use BYTES_COMMENTS for bytes lines).
+    """
+    return itertools.filterfalse(operator.methodcaller('startswith', comments), iterable)
+
+
+def lines_cleaned(iterable, chars=None, comments=COMMENTS):
+    """Return Iterable object containing lines from input iterable with strip(chars) applied, without blank lines
+    and lines which begin with comment.
+
+    Same as lines_uncommented(filter(None, lines_stripped(iterable, chars)), comments), all the stages are
+    builtin iterators, so no Python function is called per line. Lines can be str or bytes, chars and comments should
+    have the same type (use BYTES_COMMENTS for bytes lines).
+    """
+    return itertools.filterfalse(
+        operator.methodcaller('startswith', comments), filter(None, map(operator.methodcaller('strip', chars), iterable))
+    )
 
 
-def lines_uncommented(iterable, comments=(';', '#')):
-    """Return Iterable object containing only lines from iterable which didn't begin with comment"""
-    return itertools.filterfalse(lambda s: s.startswith(comments), iterable)
+def text_cleaned(text, chars=None, comments=COMMENTS):
+    """Return list of lines of a text block (split with splitlines()) cleaned as with lines_cleaned()"""
+    return list(lines_cleaned(text.splitlines(), chars, comments))
 
 
 def lines_parser(iterable, parse_line):
@@ -83,7 +124,85 @@ def lines_parser(iterable, parse_line):
             yield ParseStats(i, processed), res
 
 
-def progress_co(justify=75):
+class ParseCounters(object):
+    """Mutable running counters of lines_counted_parser() with the same fields as ParseStats"""
+
+    __slots__ = ('read', 'processed')
+
+    def __init__(self):
+        self.read = 0
+        self.processed = 0
+
+    def __repr__(self):
+        return 'ParseCounters(read={}, processed={})'.format(self.read, self.processed)
+
+    def stats(self):
+        """Return a ParseStats snapshot of the counters"""
+        return ParseStats(self.read, self.processed)
+
+
+def lines_counted_parser(iterable, parse_line, counters):
+    """Generator of results of applying parse_line() function to text line from iterable.
+
+    Same as lines_parser() but without allocation of ParseStats for each result: the running numbers of lines read
+        and processed are kept in the ParseCounters object counters instead. The counters are updated on each yield
+        and when iterable is exhausted.
+    """
+
+    read = counters.read
+
+    for read, res in enumerate(map(parse_line, iterable), start=read + 1):
+
+        if res is not None:
+            counters.read = read
+            counters.processed += 1
+            yield res
+
+    counters.read = read
+
+
+def lines_batch_parser(iterable, parse_lines, batch_size=1024):
+    """Generator of pairs:
+
+        - ParseStats after the batch
+        - list of results of applying parse_lines() function to a list of up to batch_size text lines from iterable.
+
+    parse_lines() should return a list of results, one per line, with None for lines where parsing fails. Such results
+        are dropped. If the whole batch fails generator will not yield anything but will switch to next batch.
+    """
+
+    it = iter(iterable)
+    read = processed = 0
+
+    for batch in iter(lambda: list(itertools.islice(it, batch_size)), []):
+        results = [res for res in parse_lines(batch) if res is not None]
+
+        read += len(batch)
+
+        if results:
+            processed += len(results)
+            yield ParseStats(read, processed), results
+
+
+def _format_speed(info_dict, elapsed):
+    """Return throughput and ETA part of progress line"""
+    if elapsed <= 0:
+        return ''
+
+    lines_speed = info_dict['read'] / elapsed
+    result = '  {:.0f} lines/s'.format(lines_speed)
+
+    if info_dict.get('bytes_read') is not None:
+        result += ' {:.1f} MB/s'.format(info_dict['bytes_read'] / elapsed / (1024 * 1024))
+
+    if info_dict['lines_total'] is not None and lines_speed:
+        eta = max(0, info_dict['lines_total'] - info_dict['read']) / lines_speed
+        result += ' ETA {}'.format(datetime.timedelta(seconds=int(eta)))
+
+    return result
+
+
+def progress_co(justify=75, interval=0, every=1, speed=False):
     """Print some processing state to console. Return a generator.
 
     Usage example:
@@ -91,35 +210,72 @@ def progress_co(justify=75):
         progress.send((filename, lines_read, lines_total, lines_processed))
         ...
         progress.send(lines_saved)
+
+    lines_total can be None if it is unknown yet.
+    interval - redraw the state at most once in interval seconds
+    every - redraw the state at most once in every updates
+    The state is always redrawn on a new file, on lines_saved and on close() of the generator.
+    speed - print also throughput (lines/s) and ETA for the current file. If the state tuple has the fifth item
+        bytes_read (sent by utl.files.filelist_processor_parallel()), MB/s are printed too.
     """
     def inner():
         info_dict = {'saved_lines': 0}
 
         saved_name = ''
-        while True:
-            # input can be integer or tuple (name, read, lines_total, processed)
-            info = yield
+        started = timer()
+        next_draw = 0
+        skipped = 0  # updates after the last redraw
+
+        def draw():
+            lines_total = info_dict['lines_total']
+
+            line = '\r{name} {read:n}/{total} (processed: {processed:n})  Lines saved: {saved_lines:n}'.format(
+                total='?' if lines_total is None else format(lines_total, 'n'), **info_dict
+            )
+            if speed:
+                line += _format_speed(info_dict, timer() - started)
 
-            # python 2 (long)
-            # if isinstance(info, (int, long)):
-            if isinstance(info, int):
-                info_dict['saved_lines'] += info
+            print(line.ljust(justify), end='')
 
-            else:
-                info_dict.update(zip(('name', 'read', 'lines_total', 'processed'), info))
+        try:
+            while True:
+                # input can be integer or tuple (name, read, lines_total, processed[, bytes_read])
+                info = yield
 
-                if info_dict['name'] != saved_name:
+                # python 2 (long)
+                # if isinstance(info, (int, long)):
+                if isinstance(info, int):
+                    info_dict['saved_lines'] += info
+
+                elif info[0] != saved_name:
                     if saved_name:
+                        if skipped:
+                            draw()  # the final state of the previous file
                         print(' Done!')
 
-                    saved_name = info_dict['name']
+                    saved_name = info[0]
+                    started = timer()
+                    info_dict['bytes_read'] = None
+                    info_dict.update(zip(('name', 'read', 'lines_total', 'processed', 'bytes_read'), info))
+
+                else:
+                    info_dict.update(zip(('name', 'read', 'lines_total', 'processed', 'bytes_read'), info))
+
+                    skipped += 1
+                    if skipped < every or (interval and timer() < next_draw):
+                        continue
 
-            print('\r{name} {read:n}/{lines_total:n} (processed: {processed:n})  Lines saved: {saved_lines:n}'.format(
-                **info_dict
-            ).ljust(justify), end='')
+                draw()
+
+                skipped = 0
+                if interval:
+                    next_draw = timer() + interval
+
+        except GeneratorExit:
+            if skipped:
+                draw()
 
     gen = inner()
     next(gen)
 
     return gen
-
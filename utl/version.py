@@ -60,11 +60,10 @@ Usage:
 from __future__ import unicode_literals
 from builtins import *
 
-import itertools
 import sys
 
 from .files import text_file, writable_text_file
-from .text import lines_stripped, lines_uncommented
+from .text import lines_cleaned
 
 if sys.version_info[0] == 2:
     from .misc import ignored as suppress
@@ -86,8 +85,7 @@ _SINGLE_QUOTE = " '"
 
 def _read_single_line_from_file(name):
     with text_file(name) as fo:
-        for line in itertools.dropwhile(lambda s: not s, lines_uncommented(lines_stripped(fo))):
-            return line
+        return next(lines_cleaned(fo), None)
 
 
 def _validate_main_version(txt):